@@ -1,5 +1,7 @@
 import os
 from functools import lru_cache
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 
@@ -13,11 +15,18 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = "sqlite:///./database.db"
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 25
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
     
     # Security settings
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10
+
+    # CORS settings ("*" for local dev; set explicit origins in production)
+    CORS_ORIGINS: List[str] = ["*"]
     
     # Apify settings
     APIFY_TOKEN: str = ""
@@ -1,14 +1,48 @@
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, create_engine, Session
 from app.core.config import settings
 
 
-# Create database engine for PostgreSQL
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True
+# Create database engine. SQLite (local dev/tests) doesn't benefit from a
+# connection pool and has cross-thread restrictions, so it uses NullPool;
+# PostgreSQL gets a pool sized for concurrent API load. Stale connections
+# are handled by time-based recycling instead of a pre-ping round trip on
+# every checkout.
+if settings.DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        poolclass=NullPool
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_use_lifo=True,
+        pool_reset_on_return="rollback",
+        # Cap insertmanyvalues pages so a huge bulk insert (viral-post
+        # rescrape) stays within parameter limits and bounded memory
+        insertmanyvalues_page_size=1000
+    )
+
+
+# Session factory configured once instead of rebuilding per request.
+# autoflush=False skips the identity-map scan before every SELECT (the
+# services commit explicitly) and expire_on_commit=False avoids re-loading
+# attributes after commit. Plain sessionmaker, not scoped_session: FastAPI
+# runs a sync dependency's enter and exit on different threadpool threads,
+# so a thread-local registry would hand one request's live session to
+# another and remove() would run against the wrong thread's scope.
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=Session,
+    autoflush=False,
+    expire_on_commit=False
 )
 
 
@@ -19,5 +53,8 @@ def create_db_and_tables():
 
 def get_session():
     """Get a database session."""
-    with Session(engine) as session:
+    session = SessionLocal()
+    try:
         yield session
+    finally:
+        session.close()
@@ -1,9 +1,14 @@
+import hashlib
+import time
 from typing import Generator
 
+import jwt
+from cachetools import TTLCache
+from pydantic import ValidationError
 from sqlmodel import Session
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 
 from app.db.database import get_session
 from app.core.config import settings
@@ -13,6 +18,49 @@ from app.services import user_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
+# Bind settings once so the hot decode path does plain local loads instead of
+# BaseSettings attribute lookups (and doesn't allocate the algorithm list
+# per call)
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHMS = [settings.ALGORITHM]
+
+# Cache decoded JWT payloads so repeated requests with the same token skip
+# signature verification. Keyed by SHA-256 of the raw token; TTL is kept well
+# below ACCESS_TOKEN_EXPIRE_MINUTES so the revocation window stays small.
+_payload_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Cache username -> detached user data so hot tokens also skip the SQL lookup.
+# Only plain field values are stored (no Session-bound ORM state).
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=30)
+
+
+def invalidate_user_cache(username: str) -> None:
+    """Drop a cached user after an update or delete."""
+    _user_cache.pop(username, None)
+
+
+def json_body(model):
+    """Dependency factory: validate the raw request body in a single pass.
+
+    FastAPI's default body handling goes bytes -> json.loads -> Python dict
+    -> model validation. model_validate_json parses and validates in one
+    pydantic-core pass instead, which matters for batch endpoints that take
+    thousands of texts per request. Validation rules and error shape are the
+    same as the regular path.
+    """
+    async def parse(request: Request):
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            # Mirror FastAPI's default 422 payload: loc starts with "body"
+            # and pydantic's url key is dropped
+            errors = [
+                {**err, "loc": ("body", *err["loc"])}
+                for err in e.errors(include_url=False)
+            ]
+            raise RequestValidationError(errors)
+    return parse
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency for getting database session."""
@@ -30,22 +78,40 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        if username is None:
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _payload_cache.get(cache_key)
+
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token,
+                _SECRET_KEY,
+                algorithms=_ALGORITHMS
+            )
+        except jwt.InvalidTokenError:
+            # Never cache failed verifications
             raise credentials_exception
-    except JWTError:
+        _payload_cache[cache_key] = payload
+    else:
+        # Cached payload already has a verified signature; still enforce expiry
+        exp = payload.get("exp")
+        if exp is not None and time.time() >= exp:
+            _payload_cache.pop(cache_key, None)
+            raise credentials_exception
+
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
     
+    user_data = _user_cache.get(username)
+    if user_data is not None:
+        return User(**user_data)
+
     user = user_service.get_user_by_username(db, username=username)
     if user is None:
         raise credentials_exception
-    
+
+    _user_cache[username] = user.model_dump()
     return user
 
 
@@ -1,18 +1,27 @@
+import asyncio
+import hashlib
+
+import anyio.to_thread
+import mimetypes
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from sys import prefix
 
+from cachetools import TTLCache
 from fastapi import FastAPI, Request, Response
 import httpx
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from app.core.config import settings
 from app.db.database import create_db_and_tables
 from app.routers import users, ig_accounts, ig_posts, ig_comments, indobert_sentiment, lexicon_sentiment
 from app.internal import admin
+from app.services import indobert_service, lexicon_service
 
 # Import all models to ensure they are registered with SQLModel
 from app.models import User, InstagramAccount, InstagramPost, InstagramComment
@@ -22,28 +31,55 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup: Create database tables
     create_db_and_tables()
+    # Sync (def) endpoints run on AnyIO's worker threadpool (40 threads by
+    # default). Size it against the DB pool so handler threads and pooled
+    # connections can't deadlock each other under load: every thread that
+    # can run a handler has a connection it can eventually get.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+    # Warm the sentiment models in worker threads so the first user doesn't
+    # pay the cold-start latency
+    await asyncio.gather(
+        asyncio.to_thread(indobert_service.warmup),
+        asyncio.to_thread(lexicon_service.warmup),
+    )
+    # Build the OpenAPI schema once at startup; FastAPI caches it in
+    # app.openapi_schema, so the first /api/docs or /api/openapi.json hit
+    # doesn't pay the full schema walk.
+    app.openapi()
+    # Shared HTTP client so proxied requests reuse pooled connections
+    # instead of doing a TCP+TLS handshake per request
+    app.state.http = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
     yield
-    # Shutdown: cleanup if needed
-    pass
+    # Shutdown: cleanup
+    await app.state.http.aclose()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
 )
 
 
+# Add GZip compression for JSON responses and React build assets
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify allowed origins
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 
@@ -57,28 +93,69 @@ app.include_router(ig_comments.router, prefix="/api")
 app.include_router(indobert_sentiment.router, prefix="/api")
 app.include_router(lexicon_sentiment.router, prefix="/api")
 
+# Instagram CDN URLs are content-addressed, so the same media can be cached
+# and re-served without another upstream fetch. Large files are streamed
+# through uncached to bound memory use. The cache budget counts bytes, not
+# entries (getsizeof): 1024 entries of up to 2 MB each would otherwise
+# allow ~2 GB resident.
+PROXY_CACHE_MAX_BYTES = 2 * 1024 * 1024
+PROXY_CACHE_TOTAL_BYTES = 64 * 1024 * 1024
+_proxy_cache: TTLCache = TTLCache(
+    maxsize=PROXY_CACHE_TOTAL_BYTES, ttl=3600, getsizeof=lambda entry: len(entry[0])
+)
+
+
 # Instagram media proxy endpoint
 @app.get("/instagram-proxy")
-async def instagram_proxy(url: str):
-    async with httpx.AsyncClient() as client:
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
-            "Referer": "https://www.instagram.com/",
-        }
-        resp = await client.get(url, headers=headers)
-        if resp.status_code != 200:
-            return Response(content="Failed to fetch image", status_code=resp.status_code)
-        return Response(content=resp.content, media_type=resp.headers.get("content-type"))
+async def instagram_proxy(request: Request, url: str):
+    cached = _proxy_cache.get(url)
+    if cached is not None:
+        content, media_type = cached
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=86400"},
+        )
+
+    headers = {
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
+        "Referer": "https://www.instagram.com/",
+    }
+    client = request.app.state.http
+    upstream_request = client.build_request("GET", url, headers=headers)
+    upstream = await client.send(upstream_request, stream=True)
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        return Response(content="Failed to fetch image", status_code=upstream.status_code)
+
+    media_type = upstream.headers.get("content-type")
+    content_length = upstream.headers.get("content-length")
+    if content_length and int(content_length) <= PROXY_CACHE_MAX_BYTES:
+        content = await upstream.aread()
+        await upstream.aclose()
+        _proxy_cache[url] = (content, media_type)
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=86400"},
+        )
+
+    # Stream bytes through as they arrive instead of buffering the whole
+    # image/video in memory first
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        media_type=media_type,
+        background=BackgroundTask(upstream.aclose),
+    )
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint - Serve React app if available, otherwise API info."""
-    index_path = STATIC_DIR / "index.html"
-    if STATIC_DIR.exists() and index_path.exists():
-        return FileResponse(index_path)
-    
+    if HAS_INDEX:
+        return serve_static_file("index.html", request)
+
     return {
         "message": "Welcome to the API",
         "app_name": settings.APP_NAME,
@@ -107,26 +184,76 @@ async def health_check():
 
 STATIC_DIR = Path(__file__).parent.parent / "public"
 
+# Snapshot build files sekali di import time. React build tidak berubah selama
+# proses hidup, jadi request handler cukup cek membership O(1) tanpa
+# stat() syscall per request.
+STATIC_FILES: dict = {}
+if STATIC_DIR.exists():
+    STATIC_FILES = {
+        str(p.relative_to(STATIC_DIR)): p
+        for p in STATIC_DIR.rglob("*")
+        if p.is_file()
+    }
+
+INDEX_PATH = STATIC_DIR / "index.html"
+HAS_INDEX = "index.html" in STATIC_FILES
+
+# File kecil (index.html, favicon, manifest, dll) dibaca sekali ke memory,
+# jadi hit berulang tidak perlu open()+read() dari disk. File besar tetap
+# dilayani lewat FileResponse.
+STATIC_BLOB_MAX_BYTES = 256 * 1024
+STATIC_BLOBS: dict = {}
+for _rel_path, _abs_path in STATIC_FILES.items():
+    if _abs_path.stat().st_size <= STATIC_BLOB_MAX_BYTES:
+        _content = _abs_path.read_bytes()
+        _media_type = mimetypes.guess_type(_rel_path)[0] or "application/octet-stream"
+        STATIC_BLOBS[_rel_path] = (_content, _media_type, hashlib.md5(_content).hexdigest())
+
+
+def serve_static_file(full_path: str, request: Request = None) -> Response:
+    """Serve file statis dari memory cache kalau ada, fallback ke FileResponse."""
+    blob = STATIC_BLOBS.get(full_path)
+    if blob is not None:
+        content, media_type, etag = blob
+        if request is not None and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        # index.html harus selalu divalidasi ulang supaya update SPA langsung
+        # terlihat; file lain boleh dicache browser sebentar.
+        cache_control = "no-cache" if full_path == "index.html" else "public, max-age=3600"
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={"Cache-Control": cache_control, "ETag": etag},
+        )
+    return FileResponse(STATIC_FILES[full_path])
+
+
+class HashedStaticFiles(StaticFiles):
+    """StaticFiles dengan Cache-Control panjang untuk asset ber-hash (Vite)."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # Cek apakah folder static ada
 if STATIC_DIR.exists():
     # Mount static files (untuk assets seperti JS, CSS, images)
     assets_dir = STATIC_DIR / "assets"
     if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
+        app.mount("/assets", HashedStaticFiles(directory=assets_dir), name="assets")
     
     # Serve file statis lainnya (favicon, manifest, dll)
     @app.get("/favicon.ico")
-    async def favicon():
-        favicon_path = STATIC_DIR / "favicon.ico"
-        if favicon_path.exists():
-            return FileResponse(favicon_path)
+    async def favicon(request: Request):
+        if "favicon.ico" in STATIC_FILES:
+            return serve_static_file("favicon.ico", request)
         return {"detail": "Not found"}
     
     @app.get("/manifest.json")
-    async def manifest():
-        manifest_path = STATIC_DIR / "manifest.json"
-        if manifest_path.exists():
-            return FileResponse(manifest_path)
+    async def manifest(request: Request):
+        if "manifest.json" in STATIC_FILES:
+            return serve_static_file("manifest.json", request)
         return {"detail": "Not found"}
     
     # Catch-all route untuk SPA (Single Page Application)
@@ -138,18 +265,17 @@ if STATIC_DIR.exists():
         Semua route yang tidak match dengan API akan di-redirect ke index.html
         agar React Router bisa handle routing di client-side.
         """
-        # Jika path dimulai dengan 'api/' atau sudah di-handle, skip
+        # Jika path dimulai dengan 'api/' atau sudah di-handle, langsung 404
+        # tanpa lewat pipeline JSON-serialization / static lookup
         if full_path.startswith(("api/", "docs", "redoc", "openapi.json")):
-            return {"detail": "Not found"}
+            return PlainTextResponse("Not Found", status_code=404)
         
         # Cek apakah file spesifik diminta (misal: robots.txt)
-        file_path = STATIC_DIR / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        
+        if full_path in STATIC_FILES:
+            return serve_static_file(full_path, request)
+
         # Default: return index.html untuk SPA routing
-        index_path = STATIC_DIR / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-        
+        if HAS_INDEX:
+            return serve_static_file("index.html", request)
+
         return {"detail": "React build not found. Please build your React app and copy to 'static' folder."}
@@ -1,15 +1,18 @@
 # Models package
-from app.models.enums import UserRole, SentimentLabel
+from app.models.enums import UserRole, SentimentLabel, SentimentJobStatus
 from app.models.user import User
 from app.models.ig_account import InstagramAccount
 from app.models.ig_post import InstagramPost
 from app.models.ig_comment import InstagramComment
+from app.models.sentiment_job import SentimentJob
 
 __all__ = [
     "UserRole",
     "SentimentLabel",
+    "SentimentJobStatus",
     "User",
     "InstagramAccount",
     "InstagramPost",
     "InstagramComment",
+    "SentimentJob",
 ]
\ No newline at end of file
@@ -12,3 +12,11 @@ class SentimentLabel(str, Enum):
     POSITIVE = "POSITIVE"
     NEGATIVE = "NEGATIVE"
     NEUTRAL = "NEUTRAL"
+
+
+class SentimentJobStatus(str, Enum):
+    """Background sentiment-analysis job status enum."""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
@@ -0,0 +1,8 @@
+import uuid
+
+
+def generate_cuid() -> str:
+    """Generate a unique identifier (UUID4 hex string)."""
+    # Must stay a valid UUID so the native UUID primary-key columns can
+    # store it as 16 bytes instead of text
+    return uuid.uuid4().hex
@@ -1,26 +1,27 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index, Uuid, func
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.ids import generate_cuid
+
 if TYPE_CHECKING:
     from app.models.user import User
     from app.models.ig_post import InstagramPost
 
 
-def generate_cuid() -> str:
-    """Generate a CUID-like unique identifier."""
-    import uuid
-    return str(uuid.uuid4()).replace("-", "")[:25]
-
-
 class InstagramAccount(SQLModel, table=True):
     """Instagram Account database model."""
 
     __tablename__ = "instagram_accounts"
+    __table_args__ = (
+        # Covers get_accounts_by_user without a separate PK lookup
+        Index("ix_accounts_user_id_id", "user_id", "id"),
+    )
 
-    id: str = Field(default_factory=generate_cuid, primary_key=True)
-    user_id: str = Field(foreign_key="users.id", index=True)
+    id: str = Field(default_factory=generate_cuid, sa_type=Uuid(as_uuid=False), primary_key=True)
+    user_id: str = Field(foreign_key="users.id", sa_type=Uuid(as_uuid=False), index=True)
     full_name: str
     username: str = Field(unique=True, index=True)
     profile_pic_url: str
@@ -31,8 +32,14 @@ class InstagramAccount(SQLModel, table=True):
     private: bool = Field(default=False)
     verified: bool = Field(default=False)
     is_business_account: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None, nullable=False, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()}
+    )
 
     # Relationships
     user: "User" = Relationship(back_populates="instagram_accounts")
@@ -1,36 +1,64 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index, Uuid, func, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.enums import SentimentLabel
+from app.models.ids import generate_cuid
 
 if TYPE_CHECKING:
     from app.models.ig_post import InstagramPost
 
 
-def generate_cuid() -> str:
-    """Generate a CUID-like unique identifier."""
-    import uuid
-    return str(uuid.uuid4()).replace("-", "")[:25]
-
-
 class InstagramComment(SQLModel, table=True):
     """Instagram Comment database model."""
 
     __tablename__ = "instagram_comments"
+    __table_args__ = (
+        # Covers the "comments for a post ordered by timestamp" query
+        Index("ix_comments_post_timestamp", "instagram_post_id", "timestamp"),
+        # Covers keyset pagination (WHERE post_id = ? AND id > ? ORDER BY id)
+        Index("ix_comments_post_id_id", "instagram_post_id", "id"),
+        # Unique on comment_id (also the ON CONFLICT target); INCLUDE makes
+        # the dedupe lookups index-only on PostgreSQL, ignored on sqlite.
+        Index(
+            "ix_comments_comment_id_covering",
+            "comment_id",
+            unique=True,
+            postgresql_include=["id", "instagram_post_id"],
+        ),
+        # Partial index for the sentiment backlog scan (WHERE sentiment_label
+        # IS NULL); stays tiny because labeled rows drop out of it.
+        Index(
+            "ix_comments_unlabeled",
+            "id",
+            postgresql_where=text("sentiment_label IS NULL"),
+            sqlite_where=text("sentiment_label IS NULL"),
+        ),
+    )
 
-    id: str = Field(default_factory=generate_cuid, primary_key=True)
-    instagram_post_id: str = Field(foreign_key="instagram_posts.id", index=True)
-    comment_id: str = Field(unique=True, index=True)
+    id: str = Field(default_factory=generate_cuid, sa_type=Uuid(as_uuid=False), primary_key=True)
+    instagram_post_id: str = Field(foreign_key="instagram_posts.id", sa_type=Uuid(as_uuid=False), index=True)
+    comment_id: str
     text: str
     owner_username: str
     likes_count: int = Field(default=0)
     sentiment_score: Optional[float] = Field(default=None)
     sentiment_label: Optional[SentimentLabel] = Field(default=None)
     timestamp: datetime
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None, nullable=False, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()}
+    )
 
-    # Relationships
-    instagram_post: "InstagramPost" = Relationship(back_populates="comments")
+    # Relationships. The post side is joined-eager so touching
+    # comment.instagram_post never lazy-loads with an extra SELECT.
+    instagram_post: "InstagramPost" = Relationship(
+        back_populates="comments",
+        sa_relationship_kwargs={"lazy": "joined"}
+    )
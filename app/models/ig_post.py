@@ -1,45 +1,74 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index, Uuid, func, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.enums import SentimentLabel
+from app.models.ids import generate_cuid
 
 if TYPE_CHECKING:
     from app.models.ig_account import InstagramAccount
     from app.models.ig_comment import InstagramComment
 
 
-def generate_cuid() -> str:
-    """Generate a CUID-like unique identifier."""
-    import uuid
-    return str(uuid.uuid4()).replace("-", "")[:25]
-
-
 class InstagramPost(SQLModel, table=True):
     """Instagram Post database model."""
 
     __tablename__ = "instagram_posts"
+    __table_args__ = (
+        # Covers the "posts for an account ordered by timestamp" query
+        Index("ix_posts_account_timestamp", "instagram_account_id", "timestamp"),
+        # Covers keyset pagination (WHERE account_id = ? AND id > ? ORDER BY id)
+        Index("ix_posts_account_id_id", "instagram_account_id", "id"),
+        # Unique on url (also the ON CONFLICT target); INCLUDE lets the
+        # dedupe lookups answer id/owner_username without heap visits on
+        # PostgreSQL, and is ignored on sqlite.
+        Index(
+            "ix_posts_url_covering",
+            "url",
+            unique=True,
+            postgresql_include=["id", "owner_username"],
+        ),
+        # Partial index for the sentiment backlog scan (WHERE sentiment_label
+        # IS NULL); stays tiny because labeled rows drop out of it.
+        Index(
+            "ix_posts_unlabeled",
+            "id",
+            postgresql_where=text("sentiment_label IS NULL"),
+            sqlite_where=text("sentiment_label IS NULL"),
+        ),
+    )
 
-    id: str = Field(default_factory=generate_cuid, primary_key=True)
-    instagram_account_id: str = Field(foreign_key="instagram_accounts.id", index=True)
+    id: str = Field(default_factory=generate_cuid, sa_type=Uuid(as_uuid=False), primary_key=True)
+    instagram_account_id: str = Field(foreign_key="instagram_accounts.id", sa_type=Uuid(as_uuid=False), index=True)
     caption: Optional[str] = Field(default=None)
     owner_full_name: str
     owner_username: str
     display_url: Optional[str] = Field(default=None)
     video_url: Optional[str] = Field(default=None)
-    url: str = Field(unique=True, index=True)
+    url: str
     likes_count: int = Field(default=0)
     comments_count: int = Field(default=0)
     first_comment: Optional[str] = Field(default=None)
     sentiment_score: Optional[float] = Field(default=None)
     sentiment_label: Optional[SentimentLabel] = Field(default=None)
     timestamp: datetime
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None, nullable=False, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()}
+    )
 
-    # Relationships
-    instagram_account: "InstagramAccount" = Relationship(back_populates="posts")
+    # Relationships. The account side is joined-eager so touching
+    # post.instagram_account never lazy-loads with an extra SELECT.
+    instagram_account: "InstagramAccount" = Relationship(
+        back_populates="posts",
+        sa_relationship_kwargs={"lazy": "joined"}
+    )
     comments: List["InstagramComment"] = Relationship(
         back_populates="instagram_post",
         sa_relationship_kwargs={"cascade": "all, delete-orphan"}
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Uuid, func
+from sqlmodel import Field, SQLModel
+
+from app.models.enums import SentimentJobStatus
+from app.models.ids import generate_cuid
+
+
+class SentimentJob(SQLModel, table=True):
+    """Background sentiment-analysis job database model."""
+
+    __tablename__ = "sentiment_jobs"
+
+    id: str = Field(default_factory=generate_cuid, sa_type=Uuid(as_uuid=False), primary_key=True)
+    instagram_post_id: str = Field(foreign_key="instagram_posts.id", sa_type=Uuid(as_uuid=False), index=True)
+    user_id: str = Field(foreign_key="users.id", sa_type=Uuid(as_uuid=False), index=True)
+    method: str  # "indobert" or "lexicon"
+    status: SentimentJobStatus = Field(default=SentimentJobStatus.QUEUED)
+    summary: Optional[dict] = Field(default=None, sa_type=JSON)
+    message: Optional[str] = Field(default=None)
+    created_at: Optional[datetime] = Field(
+        default=None, nullable=False, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()}
+    )
@@ -1,26 +1,26 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index, Uuid, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.enums import UserRole
+from app.models.ids import generate_cuid
 
 if TYPE_CHECKING:
     from app.models.ig_account import InstagramAccount
 
 
-def generate_cuid() -> str:
-    """Generate a CUID-like unique identifier."""
-    import uuid
-    return str(uuid.uuid4()).replace("-", "")[:25]
-
-
 class User(SQLModel, table=True):
     """User database model."""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Covers the OAuth login lookup (WHERE provider = ? AND provider_id = ?)
+        Index("ix_users_oauth_provider_id", "oauth_provider", "oauth_provider_id"),
+    )
 
-    id: str = Field(default_factory=generate_cuid, primary_key=True)
+    id: str = Field(default_factory=generate_cuid, sa_type=Uuid(as_uuid=False), primary_key=True)
     email: str = Field(unique=True, index=True)
     username: str = Field(unique=True, index=True)
     full_name: str
@@ -28,10 +28,16 @@ class User(SQLModel, table=True):
     avatar: Optional[str] = Field(default=None)  # URL to avatar image
     role: UserRole = Field(default=UserRole.USER)
     is_active: bool = Field(default=True)
-    oauth_provider: Optional[str] = Field(default=None, index=True)  # google, github, etc
+    oauth_provider: Optional[str] = Field(default=None)  # google, github, etc (indexed via composite)
     oauth_provider_id: Optional[str] = Field(default=None)  # Provider's user ID
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None, nullable=False, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()}
+    )
 
     # Relationships
     instagram_accounts: List["InstagramAccount"] = Relationship(
@@ -1,18 +1,47 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
 
 from app.dependencies import get_db, get_current_active_user
 from app.schemas.ig_comment import InstagramCommentCreate, InstagramCommentRead, InstagramCommentUpdate
 from app.schemas.apify import ScrapeCommentsRequest, ScrapeCommentsResponse
-from app.services import ig_comment_service, ig_post_service, ig_account_service
+from app.services import auth_cache, ig_comment_service, ig_post_service
 from app.services.apify_service import apify_service
 from app.models.user import User
 
 
 router = APIRouter(prefix="/instagram-comments", tags=["Instagram Comments"])
 
+# Read caches: comment pages keyed by (post_id, skip, limit), single comments
+# (with their owner id) keyed by comment id. The write handlers below drop
+# the affected entries so cached reads never outlive an update for long.
+_comment_page_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_comment_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+
+def _invalidate_comment_pages(post_id: str) -> None:
+    """Drop cached comment pages for a post after a write."""
+    for key in [k for k in _comment_page_cache if k[0] == post_id]:
+        _comment_page_cache.pop(key, None)
+
+
+def invalidate_comments_for_post(post_id: str) -> None:
+    """Drop cached pages and per-row entries for a post.
+
+    For writers outside this router (scrape inserts, the sentiment
+    worker's bulk updates) that mutate comment rows without going
+    through the CRUD handlers.
+    """
+    _invalidate_comment_pages(post_id)
+    for key in [
+        k for k, row in _comment_cache.items()
+        if row[0].instagram_post_id == post_id
+    ]:
+        _comment_cache.pop(key, None)
+
 
 # Scraping Instagram comments data using Apify by url
 @router.post("/scrape", response_model=ScrapeCommentsResponse)
@@ -39,14 +68,26 @@ def scrape_comments(
             is_newest_comments=request.is_newest_comments,
             include_nested_comments=request.include_nested_comments,
         )
-        
-        return ScrapeCommentsResponse(
-            success=results["success"],
-            message=f"Scraped comments for {len(request.post_urls)} posts. Created: {results['comments_created']}, Skipped: {results['comments_skipped']}",
-            data=results["data"],
-            comments_created=results["comments_created"],
-            errors=results["errors"] if results["errors"] else None
-        )
+
+        # The scrape inserts rows without passing through the CRUD
+        # handlers, so cached pages for the affected posts go stale here
+        for post_url in request.post_urls:
+            db_post = ig_post_service.get_post_by_url(db, url=post_url)
+            if db_post is not None:
+                _invalidate_comment_pages(db_post.id)
+
+        # Pre-serialized Response: the data list can hold thousands of row
+        # dicts, and going through response_model would re-validate and
+        # jsonable_encode every one of them. The schema stays on the route
+        # purely for the OpenAPI docs.
+        payload = {
+            "success": results["success"],
+            "message": f"Scraped comments for {len(request.post_urls)} posts. Created: {results['comments_created']}, Skipped: {results['comments_skipped']}",
+            "data": results["data"],
+            "comments_created": results["comments_created"],
+            "errors": results["errors"] if results["errors"] else None,
+        }
+        return Response(orjson.dumps(payload), media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,16 +103,14 @@ def create_comment(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new Instagram comment."""
-    # Check if post exists and user has access
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    # Check if post exists and user has access (cached post -> owner lookup)
+    owner_user_id = auth_cache.get_post_owner(db, post_id=post_id)
+    if owner_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to add comments to this post"
@@ -85,7 +124,9 @@ def create_comment(
             detail="Comment with this ID already exists"
         )
     
-    return ig_comment_service.create_comment(db=db, comment=comment, post_id=post_id)
+    db_comment = ig_comment_service.create_comment(db=db, comment=comment, post_id=post_id)
+    _invalidate_comment_pages(post_id)
+    return db_comment
 
 
 @router.post("/{post_id}/bulk", response_model=List[InstagramCommentRead], status_code=status.HTTP_201_CREATED)
@@ -96,22 +137,22 @@ def create_comments_bulk(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create multiple Instagram comments at once."""
-    # Check if post exists and user has access
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    # Check if post exists and user has access (cached post -> owner lookup)
+    owner_user_id = auth_cache.get_post_owner(db, post_id=post_id)
+    if owner_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to add comments to this post"
         )
     
-    return ig_comment_service.create_comments_bulk(db=db, comments=comments, post_id=post_id)
+    db_comments = ig_comment_service.create_comments_bulk(db=db, comments=comments, post_id=post_id)
+    _invalidate_comment_pages(post_id)
+    return db_comments
 
 
 @router.get("/post/{post_id}", response_model=List[InstagramCommentRead])
@@ -119,26 +160,36 @@ def read_comments_by_post(
     post_id: str,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all Instagram comments for a post."""
-    # Check if post exists and user has access
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    """
+    Get all Instagram comments for a post.
+
+    Prefer `after` (id of the last comment seen) for keyset pagination;
+    `skip` is kept as a deprecated OFFSET fallback.
+    """
+    # Check if post exists and user has access (cached post -> owner lookup)
+    owner_user_id = auth_cache.get_post_owner(db, post_id=post_id)
+    if owner_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this post's comments"
         )
     
-    comments = ig_comment_service.get_comments_by_post(db, post_id=post_id, skip=skip, limit=limit)
+    cache_key = (post_id, skip, limit, after)
+    comments = _comment_page_cache.get(cache_key)
+    if comments is None:
+        comments = ig_comment_service.get_comments_by_post(
+            db, post_id=post_id, skip=skip, limit=limit, after_id=after
+        )
+        _comment_page_cache[cache_key] = comments
     return comments
 
 
@@ -149,22 +200,25 @@ def read_comment(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific Instagram comment by ID."""
-    db_comment = ig_comment_service.get_comment_by_id(db, comment_id=comment_id)
-    if db_comment is None:
+    row = _comment_cache.get(comment_id)
+    if row is None:
+        row = ig_comment_service.get_comment_with_owner(db, comment_id=comment_id)
+        if row is not None:
+            _comment_cache[comment_id] = tuple(row)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram comment not found"
         )
-    
-    # Check ownership through post -> account
-    db_post = ig_post_service.get_post_by_id(db, post_id=db_comment.instagram_post_id)
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through post -> account (fetched in the same query)
+    db_comment, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this comment"
         )
-    
+
     return db_comment
 
 
@@ -176,23 +230,25 @@ def update_comment(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update an Instagram comment (mainly for sentiment analysis results)."""
-    db_comment = ig_comment_service.get_comment_by_id(db, comment_id=comment_id)
-    if db_comment is None:
+    row = ig_comment_service.get_comment_with_owner(db, comment_id=comment_id)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram comment not found"
         )
-    
-    # Check ownership through post -> account
-    db_post = ig_post_service.get_post_by_id(db, post_id=db_comment.instagram_post_id)
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through post -> account (fetched in the same query)
+    db_comment, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this comment"
         )
-    
-    return ig_comment_service.update_comment(db, comment_id=comment_id, comment_update=comment_update)
+
+    updated = ig_comment_service.update_comment(db, comment_id=comment_id, comment_update=comment_update)
+    _comment_cache.pop(comment_id, None)
+    _invalidate_comment_pages(db_comment.instagram_post_id)
+    return updated
 
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -202,20 +258,21 @@ def delete_comment(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an Instagram comment."""
-    db_comment = ig_comment_service.get_comment_by_id(db, comment_id=comment_id)
-    if db_comment is None:
+    row = ig_comment_service.get_comment_with_owner(db, comment_id=comment_id)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram comment not found"
         )
-    
-    # Check ownership through post -> account
-    db_post = ig_post_service.get_post_by_id(db, post_id=db_comment.instagram_post_id)
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through post -> account (fetched in the same query)
+    db_comment, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this comment"
         )
-    
-    ig_comment_service.delete_comment(db, comment_id=comment_id)
\ No newline at end of file
+
+    ig_comment_service.delete_comment(db, comment_id=comment_id)
+    _comment_cache.pop(comment_id, None)
+    _invalidate_comment_pages(db_comment.instagram_post_id)
\ No newline at end of file
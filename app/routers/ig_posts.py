@@ -1,18 +1,32 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session
 
 from app.dependencies import get_db, get_current_active_user
 from app.schemas.ig_post import InstagramPostCreate, InstagramPostRead, InstagramPostUpdate
 from app.schemas.apify import ScrapePostsRequest, ScrapePostsResponse
-from app.services import ig_post_service, ig_account_service
+from app.services import auth_cache, ig_post_service, ig_account_service
 from app.services.apify_service import apify_service
 from app.models.user import User
 
 
 router = APIRouter(prefix="/instagram-posts", tags=["Instagram Posts"])
 
+# Read caches: post pages keyed by (account_id, skip, limit), single posts
+# (with their owner id) keyed by post id. The write handlers below drop the
+# affected entries so cached reads never outlive an update for long.
+_post_page_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_post_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+
+def _invalidate_post_pages(account_id: str) -> None:
+    """Drop cached post pages for an account after a write."""
+    for key in [k for k in _post_page_cache if k[0] == account_id]:
+        _post_page_cache.pop(key, None)
+
 
 # Scraping Instagram posts data using Apify by username
 @router.post("/scrape", response_model=ScrapePostsResponse)
@@ -39,14 +53,25 @@ def scrape_posts(
             skip_pinned_posts=request.skip_pinned_posts,
             only_posts_newer_than=request.only_posts_newer_than,
         )
-        
-        return ScrapePostsResponse(
-            success=results["success"],
-            message=f"Scraped posts for {len(request.usernames)} accounts. Created: {results['posts_created']}, Skipped: {results['posts_skipped']}",
-            data=results["data"],
-            posts_created=results["posts_created"],
-            errors=results["errors"] if results["errors"] else None
-        )
+
+        # The scrape inserts rows without passing through the CRUD
+        # handlers, so cached pages for the affected accounts go stale here
+        for username in request.usernames:
+            db_account = ig_account_service.get_account_by_username(db, username=username)
+            if db_account is not None:
+                _invalidate_post_pages(db_account.id)
+
+        # Pre-serialized Response: the data list can hold hundreds of row
+        # dicts per scrape, so skip response_model re-validation and
+        # jsonable_encoder. The schema stays on the route for the docs.
+        payload = {
+            "success": results["success"],
+            "message": f"Scraped posts for {len(request.usernames)} accounts. Created: {results['posts_created']}, Skipped: {results['posts_skipped']}",
+            "data": results["data"],
+            "posts_created": results["posts_created"],
+            "errors": results["errors"] if results["errors"] else None,
+        }
+        return Response(orjson.dumps(payload), media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -83,7 +108,9 @@ def create_post(
             detail="Post with this URL already exists"
         )
     
-    return ig_post_service.create_post(db=db, post=post, account_id=account_id)
+    db_post = ig_post_service.create_post(db=db, post=post, account_id=account_id)
+    _invalidate_post_pages(account_id)
+    return db_post
 
 
 @router.post("/{account_id}/bulk", response_model=List[InstagramPostRead], status_code=status.HTTP_201_CREATED)
@@ -107,7 +134,9 @@ def create_posts_bulk(
             detail="Not authorized to add posts to this account"
         )
     
-    return ig_post_service.create_posts_bulk(db=db, posts=posts, account_id=account_id)
+    db_posts = ig_post_service.create_posts_bulk(db=db, posts=posts, account_id=account_id)
+    _invalidate_post_pages(account_id)
+    return db_posts
 
 
 @router.get("/account/{account_id}", response_model=List[InstagramPostRead])
@@ -115,10 +144,16 @@ def read_posts_by_account(
     account_id: str,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all Instagram posts for an account."""
+    """
+    Get all Instagram posts for an account.
+
+    Prefer `after` (id of the last post seen) for keyset pagination;
+    `skip` is kept as a deprecated OFFSET fallback.
+    """
     # Check if account exists and belongs to user
     db_account = ig_account_service.get_account_by_id(db, account_id=account_id)
     if db_account is None:
@@ -132,7 +167,13 @@ def read_posts_by_account(
             detail="Not authorized to access this account"
         )
     
-    posts = ig_post_service.get_posts_by_account(db, account_id=account_id, skip=skip, limit=limit)
+    cache_key = (account_id, skip, limit, after)
+    posts = _post_page_cache.get(cache_key)
+    if posts is None:
+        posts = ig_post_service.get_posts_by_account(
+            db, account_id=account_id, skip=skip, limit=limit, after_id=after
+        )
+        _post_page_cache[cache_key] = posts
     return posts
 
 
@@ -143,21 +184,25 @@ def read_post(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific Instagram post by ID."""
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    row = _post_cache.get(post_id)
+    if row is None:
+        row = ig_post_service.get_post_with_owner(db, post_id=post_id)
+        if row is not None:
+            _post_cache[post_id] = tuple(row)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    # Check ownership through account
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through account (fetched in the same query)
+    db_post, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this post"
         )
-    
+
     return db_post
 
 
@@ -169,22 +214,25 @@ def update_post(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update an Instagram post."""
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    row = ig_post_service.get_post_with_owner(db, post_id=post_id)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    # Check ownership through account
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through account (fetched in the same query)
+    db_post, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this post"
         )
-    
-    return ig_post_service.update_post(db, post_id=post_id, post_update=post_update)
+
+    updated = ig_post_service.update_post(db, post_id=post_id, post_update=post_update)
+    _post_cache.pop(post_id, None)
+    _invalidate_post_pages(db_post.instagram_account_id)
+    return updated
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -194,19 +242,22 @@ def delete_post(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an Instagram post."""
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    row = ig_post_service.get_post_with_owner(db, post_id=post_id)
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    # Check ownership through account
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+
+    # Check ownership through account (fetched in the same query)
+    db_post, owner_user_id = row
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this post"
         )
-    
-    ig_post_service.delete_post(db, post_id=post_id)
\ No newline at end of file
+
+    ig_post_service.delete_post(db, post_id=post_id)
+    auth_cache.invalidate_post_owner(post_id)
+    _post_cache.pop(post_id, None)
+    _invalidate_post_pages(db_post.instagram_account_id)
\ No newline at end of file
@@ -4,40 +4,36 @@ IndoBERT Sentiment Analysis Router
 Endpoints untuk analisis sentimen menggunakan model IndoBERT fine-tuned.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
-from app.dependencies import get_db, get_current_active_user
+from app.dependencies import get_db, get_current_active_user, json_body
 from app.schemas.indobert import (
     IndoBertPredictRequest,
-    IndoBertPredictResponse,
     IndoBertSinglePredictRequest,
     IndoBertSinglePredictResponse,
-    IndoBertPrediction,
     SentimentLabel,
-    AnalyzePostCommentsResponse,
-    CommentSentimentResult,
 )
+from app.schemas.sentiment_job import AnalyzePostJobResponse, SentimentJobRead
 from app.services.indobert_service import (
     predict_sentiment,
-    predict_sentiment_single,
     get_indobert_model,
 )
-from app.services import ig_comment_service, ig_post_service, ig_account_service
+from app.services import auth_cache, sentiment_job_service
+from app.workers import inference_worker, sentiment_worker
 from app.models.user import User
-from app.models.enums import SentimentLabel as DBSentimentLabel
 
 
-# Mapping dari IndoBERT label ke database enum
-INDOBERT_TO_DB_LABEL = {
-    "Positif": DBSentimentLabel.POSITIVE,
-    "Negatif": DBSentimentLabel.NEGATIVE,
-    "Netral": DBSentimentLabel.NEUTRAL,
-}
+router = APIRouter(prefix="/indobert", tags=["IndoBERT Sentiment"])
 
+# Precomputed value -> member map; skips the Enum constructor call per row
+_LABEL_LOOKUP = {m.value: m for m in SentimentLabel}
 
-router = APIRouter(prefix="/indobert", tags=["IndoBERT Sentiment"])
+# Micro-batch size for streamed batch prediction
+PREDICT_BATCH_SIZE = 32
 
 
 @router.get("/health")
@@ -55,44 +51,49 @@ def health_check():
         raise HTTPException(status_code=503, detail=f"Model not available: {str(e)}")
 
 
-@router.post("/predict", response_model=IndoBertPredictResponse)
-def predict_batch(payload: IndoBertPredictRequest):
+@router.post("/predict")
+async def predict_batch(
+    payload: IndoBertPredictRequest = Depends(json_body(IndoBertPredictRequest))
+):
     """
     Prediksi sentimen untuk multiple texts (batch).
-    
+
     - **texts**: List of texts untuk dianalisis
-    
-    Returns predictions dengan label (Negatif/Netral/Positif) dan confidence score.
+
+    Streams NDJSON: satu prediksi per baris (label Negatif/Netral/Positif,
+    score, scores), dikirim begitu tiap micro-batch 32 teks selesai, jadi
+    klien tidak menunggu seluruh payload di-inference dulu.
     """
-    try:
-        outputs = predict_sentiment(payload.texts)
-        predictions = [
-            IndoBertPrediction(
-                label=SentimentLabel(o["label"]),
-                score=o["score"],
-                scores=o["scores"]
-            )
-            for o in outputs
-        ]
-        return IndoBertPredictResponse(predictions=predictions)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    async def stream():
+        texts = payload.texts
+        for i in range(0, len(texts), PREDICT_BATCH_SIZE):
+            try:
+                preds = await run_in_threadpool(predict_sentiment, texts[i:i + PREDICT_BATCH_SIZE])
+            except Exception as e:
+                yield orjson.dumps({"error": f"Prediction failed: {str(e)}"}) + b"\n"
+                return
+            for pred in preds:
+                yield orjson.dumps(pred) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @router.post("/predict/single", response_model=IndoBertSinglePredictResponse)
-def predict_single(payload: IndoBertSinglePredictRequest):
+async def predict_single(payload: IndoBertSinglePredictRequest):
     """
     Prediksi sentimen untuk single text.
-    
+
     - **text**: Text untuk dianalisis
-    
+
     Returns prediction dengan label, score, dan scores untuk semua label.
+    Request yang datang bersamaan digabung jadi satu micro-batch ONNX
+    oleh inference_worker.
     """
     try:
-        output = predict_sentiment_single(payload.text)
+        output = await inference_worker.predict_single_batched(payload.text)
         return IndoBertSinglePredictResponse(
             text=payload.text,
-            label=SentimentLabel(output["label"]),
+            label=_LABEL_LOOKUP[output["label"]],
             score=output["score"],
             scores=output["scores"]
         )
@@ -100,98 +101,69 @@ def predict_single(payload: IndoBertSinglePredictRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@router.post("/analyze-post/{post_id}", response_model=AnalyzePostCommentsResponse)
+@router.post(
+    "/analyze-post/{post_id}",
+    response_model=AnalyzePostJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 def analyze_post_comments(
     post_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Analyze sentiment untuk SEMUA komentar pada satu post.
-    
+    Enqueue analisis sentiment untuk SEMUA komentar pada satu post.
+
     Endpoint ini akan:
-    1. Mengambil semua komentar dari post
-    2. Melakukan prediksi sentiment menggunakan IndoBERT
-    3. Menyimpan hasil sentiment ke database
-    4. Mengembalikan summary hasil analisis
-    
+    1. Validasi post dan akses user
+    2. Membuat job dan menjalankan prediksi IndoBERT di background
+    3. Langsung balas 202 dengan job_id
+
+    Cek progres via GET /indobert/jobs/{job_id}.
+
     - **post_id**: ID post yang komentarnya akan dianalisis
     """
-    # 1. Validasi post exists dan user punya akses
-    db_post = ig_post_service.get_post_by_id(db, post_id=post_id)
-    if db_post is None:
+    # 1. Validasi post exists dan user punya akses (pakai cache post -> owner)
+    owner_user_id = auth_cache.get_post_owner(db, post_id=post_id)
+    if owner_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram post not found"
         )
-    
-    db_account = ig_account_service.get_account_by_id(db, account_id=db_post.instagram_account_id)
-    if db_account.user_id != current_user.id:
+    if owner_user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to analyze this post's comments"
         )
-    
-    # 2. Ambil semua komentar dari post (tanpa limit)
-    comments = ig_comment_service.get_comments_by_post(db, post_id=post_id, skip=0, limit=10000)
-    
-    if not comments:
-        return AnalyzePostCommentsResponse(
-            success=True,
-            post_id=post_id,
-            total_comments=0,
-            analyzed_count=0,
-            results=[],
-            summary={"Positif": 0, "Negatif": 0, "Netral": 0},
-            message="No comments found for this post"
-        )
-    
-    # 3. Extract texts dan predict batch
-    texts = [c.text for c in comments]
-    
-    try:
-        predictions = predict_sentiment(texts)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Sentiment prediction failed: {str(e)}"
-        )
-    
-    # 4. Update setiap komentar dengan hasil sentiment
-    results: List[CommentSentimentResult] = []
-    summary = {"Positif": 0, "Negatif": 0, "Netral": 0}
-    
-    for comment, pred in zip(comments, predictions):
-        indobert_label = pred["label"]  # "Positif", "Negatif", "Netral"
-        db_label = INDOBERT_TO_DB_LABEL.get(indobert_label)
-        score = pred["score"]
-        
-        # Update comment di database
-        comment.sentiment_label = db_label
-        comment.sentiment_score = score
-        db.add(comment)
-        
-        # Track summary
-        summary[indobert_label] = summary.get(indobert_label, 0) + 1
-        
-        # Build result
-        results.append(CommentSentimentResult(
-            comment_id=comment.id,
-            text=comment.text[:100] + "..." if len(comment.text) > 100 else comment.text,
-            label=SentimentLabel(indobert_label),
-            score=score,
-            scores=pred["scores"]
-        ))
-    
-    # 5. Commit semua perubahan
-    db.commit()
-    
-    return AnalyzePostCommentsResponse(
+
+    # 2. Buat job lalu jalankan pipeline-nya setelah response terkirim,
+    # supaya handler tidak menahan koneksi DB selama inference
+    job = sentiment_job_service.create_job(
+        db, post_id=post_id, user_id=current_user.id, method="indobert"
+    )
+    background_tasks.add_task(sentiment_worker.analyze_post_task, job.id)
+
+    return AnalyzePostJobResponse(
         success=True,
+        job_id=job.id,
         post_id=post_id,
-        total_comments=len(comments),
-        analyzed_count=len(results),
-        results=results,
-        summary=summary,
-        message=f"Successfully analyzed {len(results)} comments"
+        status=job.status,
+        message="Sentiment analysis queued"
     )
+
+
+@router.get("/jobs/{job_id}", response_model=SentimentJobRead)
+def read_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get status dan summary dari satu job analisis sentiment."""
+    job = sentiment_job_service.get_job_by_id(db, job_id=job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sentiment job not found"
+        )
+    return job
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 
-from app.dependencies import get_db, get_current_active_user
+from app.dependencies import get_db, get_current_active_user, invalidate_user_cache
 from app.schemas.user import UserCreate, UserRead, UserUpdate, Token
 from app.services import user_service
 from app.models.user import User
@@ -17,22 +17,21 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
-    # Check if username already exists
-    db_user = user_service.get_user_by_username(db, username=user.username)
-    if db_user:
+    # Check username and email conflicts in one round trip
+    username_match, email_match = user_service.get_user_conflicts(
+        db, username=user.username, email=user.email
+    )
+    if username_match:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
-    
-    # Check if email already exists
-    db_user = user_service.get_user_by_email(db, email=user.email)
-    if db_user:
+    if email_match:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
+
     return user_service.create_user(db=db, user=user)
 
 
@@ -102,6 +101,7 @@ def update_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    invalidate_user_cache(db_user.username)
     return db_user
 
 
@@ -112,9 +112,13 @@ def delete_user(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a user."""
-    success = user_service.delete_user(db, user_id=user_id)
-    if not success:
+    db_user = user_service.get_user_by_id(db, user_id=user_id)
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+
+    username = db_user.username
+    user_service.delete_user(db, user_id=user_id)
+    invalidate_user_cache(username)
@@ -1,7 +1,9 @@
 from datetime import datetime
+from functools import cached_property
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic.alias_generators import to_camel
 
 
 # ========== Request Schemas ==========
@@ -10,14 +12,15 @@ class ScrapeProfileRequest(BaseModel):
     """Request schema for scraping Instagram profile."""
     usernames: List[str] = Field(..., description="List of Instagram usernames to scrape")
     include_about_section: bool = Field(default=True, description="Whether to include the About section")
-    
-    class Config:
-        json_schema_extra = {
+
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "usernames": ["instagram", "natgeo"],
                 "include_about_section": True,
             }
         }
+    )
 
 
 class ScrapePostsRequest(BaseModel):
@@ -29,9 +32,9 @@ class ScrapePostsRequest(BaseModel):
         default=None,
         description="If set, only scrape posts newer than this timestamp (ISO 8601)",
     )
-    
-    class Config:
-        json_schema_extra = {
+
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "usernames": ["instagram"],
                 "results_limit": 10,
@@ -39,6 +42,7 @@ class ScrapePostsRequest(BaseModel):
                 "only_posts_newer_than": None,
             }
         }
+    )
 
 
 class ScrapeCommentsRequest(BaseModel):
@@ -53,9 +57,9 @@ class ScrapeCommentsRequest(BaseModel):
         default=None,
         description="If set, include nested/thread replies as supported by the Apify actor",
     )
-    
-    class Config:
-        json_schema_extra = {
+
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "post_urls": ["https://www.instagram.com/p/ABC123/"],
                 "results_limit": 50,
@@ -63,65 +67,67 @@ class ScrapeCommentsRequest(BaseModel):
                 "include_nested_comments": None,
             }
         }
+    )
 
 
 # ========== Apify Raw Response Schemas ==========
 
-class ApifyProfileData(BaseModel):
+class ApifyItemBase(BaseModel):
+    """Base for raw Apify items: camelCase wire names via one alias generator.
+
+    A single to_camel generator replaces per-field Field(alias=...) nodes,
+    which keeps the core-schema build (paid at import time) small.
+    """
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class ApifyProfileData(ApifyItemBase):
     """Raw profile data from Apify Instagram Profile Scraper."""
     id: Optional[str] = None
     username: str
-    fullName: Optional[str] = Field(default=None, alias="fullName")
     full_name: Optional[str] = None
     biography: Optional[str] = None
-    profilePicUrl: Optional[str] = Field(default=None, alias="profilePicUrl")
-    profilePicUrlHD: Optional[str] = Field(default=None, alias="profilePicUrlHD")
-    postsCount: Optional[int] = Field(default=0, alias="postsCount")
-    followersCount: Optional[int] = Field(default=0, alias="followersCount")
-    followsCount: Optional[int] = Field(default=0, alias="followsCount")
+    profile_pic_url: Optional[str] = None
+    # Apify spells the trailing HD in full caps, which to_camel can't produce
+    profile_pic_url_hd: Optional[str] = Field(default=None, alias="profilePicUrlHD")
+    posts_count: Optional[int] = 0
+    followers_count: Optional[int] = 0
+    follows_count: Optional[int] = 0
     private: bool = False
     verified: bool = False
-    isBusinessAccount: bool = Field(default=False, alias="isBusinessAccount")
-    
-    class Config:
-        populate_by_name = True
-        
-    @property
+    is_business_account: bool = False
+
+    @computed_field
+    @cached_property
     def display_name(self) -> str:
-        return self.fullName or self.full_name or self.username
+        return self.full_name or self.username
 
 
-class ApifyPostData(BaseModel):
+class ApifyPostData(ApifyItemBase):
     """Raw post data from Apify Instagram Post Scraper."""
     id: Optional[str] = None
-    shortCode: Optional[str] = Field(default=None, alias="shortCode")
+    short_code: Optional[str] = None
     caption: Optional[str] = None
     url: str
-    displayUrl: Optional[str] = Field(default=None, alias="displayUrl")
-    videoUrl: Optional[str] = Field(default=None, alias="videoUrl")
-    likesCount: int = Field(default=0, alias="likesCount")
-    commentsCount: int = Field(default=0, alias="commentsCount")
-    ownerFullName: Optional[str] = Field(default=None, alias="ownerFullName")
-    ownerUsername: str = Field(alias="ownerUsername")
+    display_url: Optional[str] = None
+    video_url: Optional[str] = None
+    likes_count: int = 0
+    comments_count: int = 0
+    owner_full_name: Optional[str] = None
+    owner_username: str
     timestamp: Optional[datetime] = None
-    firstComment: Optional[str] = Field(default=None, alias="firstComment")
-    
-    class Config:
-        populate_by_name = True
+    first_comment: Optional[str] = None
 
 
-class ApifyCommentData(BaseModel):
+class ApifyCommentData(ApifyItemBase):
     """Raw comment data from Apify Instagram Comment Scraper."""
     id: str
     text: str
-    ownerUsername: str = Field(alias="ownerUsername")
-    ownerProfilePicUrl: Optional[str] = Field(default=None, alias="ownerProfilePicUrl")
-    likesCount: int = Field(default=0, alias="likesCount")
+    owner_username: str
+    owner_profile_pic_url: Optional[str] = None
+    likes_count: int = 0
     timestamp: Optional[datetime] = None
-    repliesCount: int = Field(default=0, alias="repliesCount")
-    
-    class Config:
-        populate_by_name = True
+    replies_count: int = 0
 
 
 # ========== Response Schemas ==========
@@ -46,3 +46,4 @@ class InstagramAccountRead(InstagramAccountBase):
 
     class Config:
         from_attributes = True
+        frozen = True
@@ -15,9 +15,9 @@ class InstagramCommentBase(BaseModel):
     timestamp: datetime
 
 
-class InstagramCommentCreate(InstagramCommentBase):
-    """Schema for creating an Instagram Comment."""
-    pass
+# Create adds no fields over Base; aliasing instead of subclassing avoids
+# compiling a second identical core schema at import time.
+InstagramCommentCreate = InstagramCommentBase
 
 
 class InstagramCommentUpdate(BaseModel):
@@ -39,3 +39,4 @@ class InstagramCommentRead(InstagramCommentBase):
 
     class Config:
         from_attributes = True
+        frozen = True
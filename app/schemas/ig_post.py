@@ -20,9 +20,9 @@ class InstagramPostBase(BaseModel):
     timestamp: datetime
 
 
-class InstagramPostCreate(InstagramPostBase):
-    """Schema for creating an Instagram Post."""
-    pass
+# Create adds no fields over Base; aliasing instead of subclassing avoids
+# compiling a second identical core schema at import time.
+InstagramPostCreate = InstagramPostBase
 
 
 class InstagramPostUpdate(BaseModel):
@@ -48,3 +48,4 @@ class InstagramPostRead(InstagramPostBase):
 
     class Config:
         from_attributes = True
+        frozen = True
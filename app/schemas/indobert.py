@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from enum import Enum
 
+# pydantic menolak typing.TypedDict di Python < 3.12
+from typing_extensions import TypedDict
+
 
 class SentimentLabel(str, Enum):
     NEGATIF = "Negatif"
@@ -9,6 +12,14 @@ class SentimentLabel(str, Enum):
     POSITIF = "Positif"
 
 
+class SentimentScores(TypedDict):
+    """Skor per label; shape tetap, jadi pydantic memvalidasi 3 slot
+    dengan key yang sudah diketahui, bukan dict generik."""
+    Negatif: float
+    Netral: float
+    Positif: float
+
+
 # ============================================================
 # Request Schemas
 # ============================================================
@@ -51,7 +62,7 @@ class IndoBertPrediction(BaseModel):
     """Single prediction result."""
     label: SentimentLabel = Field(..., description="Predicted sentiment label")
     score: float = Field(..., ge=0, le=1, description="Confidence score (0-1)")
-    scores: Optional[dict] = Field(None, description="All label scores")
+    scores: Optional[SentimentScores] = Field(None, description="All label scores")
 
 
 class IndoBertPredictResponse(BaseModel):
@@ -64,7 +75,7 @@ class IndoBertSinglePredictResponse(BaseModel):
     text: str
     label: SentimentLabel
     score: float
-    scores: dict = Field(..., description="Scores for all labels")
+    scores: SentimentScores = Field(..., description="Scores for all labels")
 
 
 # ============================================================
@@ -77,7 +88,7 @@ class CommentSentimentResult(BaseModel):
     text: str
     label: SentimentLabel
     score: float
-    scores: dict
+    scores: SentimentScores
 
 
 class AnalyzePostCommentsResponse(BaseModel):
@@ -1,12 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-from enum import Enum
+from typing import List, Dict
 
+from app.schemas.indobert import SentimentLabel
 
-class LexiconSentimentLabel(str, Enum):
-    POSITIF = "Positif"
-    NEGATIF = "Negatif"
-    NETRAL = "Netral"
+# Kedua pipeline memakai label API yang sama (Negatif/Netral/Positif);
+# satu enum bersama berarti satu core schema dan tanpa konversi antar enum.
+LexiconSentimentLabel = SentimentLabel
 
 
 # ============================================================
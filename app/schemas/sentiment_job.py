@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.enums import SentimentJobStatus
+
+
+class AnalyzePostJobResponse(BaseModel):
+    """Response for enqueueing a post sentiment-analysis job."""
+    success: bool
+    job_id: str
+    post_id: str
+    status: SentimentJobStatus
+    message: str
+
+
+class SentimentJobRead(BaseModel):
+    """Schema for reading a sentiment job."""
+    id: str
+    instagram_post_id: str
+    method: str
+    status: SentimentJobStatus
+    summary: Optional[dict] = None
+    message: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+        frozen = True
@@ -49,6 +49,7 @@ class UserRead(UserBase):
 
     class Config:
         from_attributes = True
+        frozen = True
 
 
 class UserLogin(BaseModel):
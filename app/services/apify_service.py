@@ -1,11 +1,15 @@
+import asyncio
+from dataclasses import asdict, dataclass, field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from apify_client import ApifyClient
-from sqlalchemy.exc import IntegrityError
+import orjson
+from apify_client import ApifyClient, ApifyClientAsync
+from sqlalchemy import insert, update
 from sqlmodel import Session, select
 
 from app.core.config import settings
+from app.models.ids import generate_cuid
 from app.models.ig_account import InstagramAccount
 from app.models.ig_comment import InstagramComment
 from app.models.ig_post import InstagramPost
@@ -15,15 +19,121 @@ from app.schemas.ig_comment import InstagramCommentCreate
 from app.services import ig_account_service
 
 
+# Bound once so the per-row hot loops do plain local calls
+_fromiso = datetime.fromisoformat
+_utcnow = datetime.utcnow
+
+
+# Key-priority tuples for Apify fields whose name varies between actor
+# versions; _first() probes them in order with one dict lookup each.
+_FULL_NAME_KEYS = ("fullName", "full_name", "username")
+_PROFILE_PIC_KEYS = ("profilePicUrlHD", "profilePicUrl")
+_OWNER_FULL_NAME_KEYS = ("ownerFullName", "ownerUsername")
+_SOURCE_USERNAME_KEYS = ("username", "inputUsername", "input_username")
+_POST_URL_KEYS = ("postUrl", "inputUrl")
+
+
+def _first(d: Dict[str, Any], keys: tuple, default: Any = "") -> Any:
+    """Return the first truthy value of ``keys`` in ``d``, else ``default``."""
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return default
+
+
+# Result accumulators for the save flows. Slot-backed attributes keep the
+# hot-loop increments and error appends off the string-hashing dict path;
+# asdict() converts back to the plain dict shape the routers return.
+@dataclass(slots=True)
+class _ProfileResults:
+    success: bool = True
+    accounts_created: int = 0
+    accounts_updated: int = 0
+    errors: List[str] = field(default_factory=list)
+    data: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _PostResults:
+    success: bool = True
+    posts_created: int = 0
+    posts_skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+    data: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _CommentResults:
+    success: bool = True
+    comments_created: int = 0
+    comments_skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+    data: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _parse_timestamp(timestamp: Any) -> datetime:
+    """Parse an Apify ISO-8601 timestamp, defaulting to now on bad input.
+
+    Python 3.11+ fromisoformat accepts the trailing 'Z' natively, so the
+    happy path is a single C call with no per-row string allocation; the
+    Z-replace only runs as a fallback on older runtimes.
+    """
+    if isinstance(timestamp, str):
+        try:
+            return _fromiso(timestamp)
+        except ValueError:
+            pass
+        if timestamp.endswith("Z"):
+            try:
+                return _fromiso(timestamp[:-1] + "+00:00")
+            except ValueError:
+                pass
+        return _utcnow()
+    if timestamp is None:
+        return _utcnow()
+    return timestamp
+
+
+
 class ApifyService:
     """Service for interacting with Apify actors."""
     
+    # Per-host cap for concurrent actor runs fanned out by the *_batches
+    # helpers; keeps us well under Apify's account-level run limits.
+    MAX_CONCURRENT_RUNS = 8
+
     def __init__(self):
         self.client = ApifyClient(settings.APIFY_TOKEN)
+        self.async_client = ApifyClientAsync(settings.APIFY_TOKEN)
         self.profile_scraper_id = settings.APIFY_INSTAGRAM_PROFILE_SCRAPER_ID
         self.post_scraper_id = settings.APIFY_INSTAGRAM_POST_SCRAPER_ID
         self.comment_scraper_id = settings.APIFY_INSTAGRAM_COMMENTS_SCRAPER_ID
-    
+
+    def _fetch_dataset_items(self, dataset_id: str) -> List[Dict[str, Any]]:
+        """Download a run's dataset as one raw JSON blob and decode it.
+
+        iterate_items() pages through the dataset with one API round trip per
+        page and decodes each page with stdlib json; fetching the bytes in a
+        single request and decoding with orjson is one round trip and one
+        C-level parse regardless of dataset size.
+        """
+        raw = self.client.dataset(dataset_id).get_items_as_bytes(item_format="json")
+        return orjson.loads(raw)
+
+    async def _run_actor_async(self, actor_id: str, run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run an actor and download its dataset without blocking the loop.
+
+        Each Apify call is a multi-second HTTP wait; going through the async
+        client lets callers overlap several actor runs instead of paying the
+        sum of their wall times.
+        """
+        run = await self.async_client.actor(actor_id).call(run_input=run_input)
+        raw = await self.async_client.dataset(run["defaultDatasetId"]).get_items_as_bytes(
+            item_format="json"
+        )
+        return orjson.loads(raw)
+
     def scrape_profiles(
         self,
         usernames: List[str],
@@ -47,9 +157,7 @@ class ApifyService:
         run = self.client.actor(self.profile_scraper_id).call(run_input=run_input)
         
         # Fetch results from the run's dataset
-        items = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
-        
-        return items
+        return self._fetch_dataset_items(run["defaultDatasetId"])
     
     def scrape_posts(
         self,
@@ -81,9 +189,7 @@ class ApifyService:
         run = self.client.actor(self.post_scraper_id).call(run_input=run_input)
         
         # Fetch results from the run's dataset
-        items = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
-        
-        return items
+        return self._fetch_dataset_items(run["defaultDatasetId"])
     
     def scrape_comments(
         self,
@@ -114,12 +220,85 @@ class ApifyService:
         
         # Run the actor and wait for it to finish
         run = self.client.actor(self.comment_scraper_id).call(run_input=run_input)
-        
+
         # Fetch results from the run's dataset
-        items = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
-        
-        return items
-    
+        return self._fetch_dataset_items(run["defaultDatasetId"])
+
+    async def scrape_profiles_async(
+        self,
+        usernames: List[str],
+        include_about_section: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of scrape_profiles; same actor, same input shape."""
+        return await self._run_actor_async(
+            self.profile_scraper_id,
+            {
+                "usernames": usernames,
+                "includeAboutSection": include_about_section,
+            },
+        )
+
+    async def scrape_posts_async(
+        self,
+        usernames: List[str],
+        results_limit: int = 10,
+        skip_pinned_posts: bool = False,
+        only_posts_newer_than: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of scrape_posts; same actor, same input shape."""
+        run_input = {
+            "username": usernames,
+            "resultsLimit": results_limit,
+            "skipPinnedPosts": skip_pinned_posts,
+        }
+        if only_posts_newer_than is not None:
+            run_input["onlyPostsNewerThan"] = only_posts_newer_than.isoformat()
+        return await self._run_actor_async(self.post_scraper_id, run_input)
+
+    async def scrape_comments_async(
+        self,
+        post_urls: List[str],
+        results_limit: int = 50,
+        is_newest_comments: Optional[bool] = None,
+        include_nested_comments: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of scrape_comments; same actor, same input shape."""
+        run_input = {
+            "directUrls": post_urls,
+            "resultsLimit": results_limit,
+        }
+        if is_newest_comments is not None:
+            run_input["isNewestComments"] = is_newest_comments
+        if include_nested_comments is not None:
+            run_input["includeNestedComments"] = include_nested_comments
+        return await self._run_actor_async(self.comment_scraper_id, run_input)
+
+    async def scrape_posts_batches(
+        self,
+        username_batches: List[List[str]],
+        results_limit: int = 10,
+        skip_pinned_posts: bool = False,
+        only_posts_newer_than: Optional[datetime] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Fan out one post-scrape actor run per username batch.
+
+        Runs execute concurrently under a semaphore of MAX_CONCURRENT_RUNS,
+        so total wall time approaches the slowest run rather than the sum.
+        Results come back in batch order.
+        """
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_RUNS)
+
+        async def one(batch: List[str]) -> List[Dict[str, Any]]:
+            async with sem:
+                return await self.scrape_posts_async(
+                    batch,
+                    results_limit=results_limit,
+                    skip_pinned_posts=skip_pinned_posts,
+                    only_posts_newer_than=only_posts_newer_than,
+                )
+
+        return await asyncio.gather(*(one(batch) for batch in username_batches))
+
     def parse_profile_data(self, raw_data: Dict[str, Any]) -> InstagramAccountCreate:
         """
         Parse raw Apify profile data to InstagramAccountCreate schema.
@@ -130,19 +309,31 @@ class ApifyService:
         Returns:
             InstagramAccountCreate schema
         """
-        return InstagramAccountCreate(
-            full_name=raw_data.get("fullName") or raw_data.get("full_name") or raw_data.get("username", ""),
-            username=raw_data.get("username", ""),
-            profile_pic_url=raw_data.get("profilePicUrlHD") or raw_data.get("profilePicUrl") or "",
-            posts_count=raw_data.get("postsCount", 0),
-            followers_count=raw_data.get("followersCount", 0),
-            follows_count=raw_data.get("followsCount", 0),
-            biography=raw_data.get("biography"),
-            private=raw_data.get("private", False),
-            verified=raw_data.get("verified", False),
-            is_business_account=raw_data.get("isBusinessAccount", False),
-        )
-    
+        return InstagramAccountCreate.model_validate(self.parse_profile_fields(raw_data))
+
+    def parse_profile_fields(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map raw Apify profile data to InstagramAccountCreate field values.
+
+        Args:
+            raw_data: Raw profile data from Apify
+
+        Returns:
+            Dict of InstagramAccountCreate fields (not yet validated)
+        """
+        return {
+            "full_name": _first(raw_data, _FULL_NAME_KEYS),
+            "username": raw_data.get("username", ""),
+            "profile_pic_url": _first(raw_data, _PROFILE_PIC_KEYS),
+            "posts_count": raw_data.get("postsCount", 0),
+            "followers_count": raw_data.get("followersCount", 0),
+            "follows_count": raw_data.get("followsCount", 0),
+            "biography": raw_data.get("biography"),
+            "private": raw_data.get("private", False),
+            "verified": raw_data.get("verified", False),
+            "is_business_account": raw_data.get("isBusinessAccount", False),
+        }
+
     def parse_post_data(self, raw_data: Dict[str, Any]) -> InstagramPostCreate:
         """
         Parse raw Apify post data to InstagramPostCreate schema.
@@ -153,56 +344,60 @@ class ApifyService:
         Returns:
             InstagramPostCreate schema
         """
-        # Parse timestamp
-        timestamp = raw_data.get("timestamp")
-        if isinstance(timestamp, str):
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            except Exception:
-                timestamp = datetime.utcnow()
-        elif timestamp is None:
-            timestamp = datetime.utcnow()
-            
-        return InstagramPostCreate(
-            caption=raw_data.get("caption"),
-            owner_full_name=raw_data.get("ownerFullName") or raw_data.get("ownerUsername", ""),
-            owner_username=raw_data.get("ownerUsername", ""),
-            display_url=raw_data.get("displayUrl"),
-            video_url=raw_data.get("videoUrl"),
-            url=raw_data.get("url", ""),
-            likes_count=raw_data.get("likesCount", 0),
-            comments_count=raw_data.get("commentsCount", 0),
-            first_comment=raw_data.get("firstComment"),
-            timestamp=timestamp,
-        )
-    
+        return InstagramPostCreate.model_validate(self.parse_post_fields(raw_data))
+
+    def parse_post_fields(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map raw Apify post data to InstagramPostCreate field values.
+
+        Args:
+            raw_data: Raw post data from Apify
+
+        Returns:
+            Dict of InstagramPostCreate fields (not yet validated)
+        """
+        return {
+            "caption": raw_data.get("caption"),
+            "owner_full_name": _first(raw_data, _OWNER_FULL_NAME_KEYS),
+            "owner_username": raw_data.get("ownerUsername", ""),
+            "display_url": raw_data.get("displayUrl"),
+            "video_url": raw_data.get("videoUrl"),
+            "url": raw_data.get("url", ""),
+            "likes_count": raw_data.get("likesCount", 0),
+            "comments_count": raw_data.get("commentsCount", 0),
+            "first_comment": raw_data.get("firstComment"),
+            "timestamp": _parse_timestamp(raw_data.get("timestamp")),
+        }
+
+    def parse_comment_fields(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map raw Apify comment data to InstagramCommentCreate field values.
+
+        Args:
+            raw_data: Raw comment data from Apify
+
+        Returns:
+            Dict of InstagramCommentCreate fields (not yet validated)
+        """
+        return {
+            "comment_id": raw_data.get("id", ""),
+            "text": raw_data.get("text", ""),
+            "owner_username": raw_data.get("ownerUsername", ""),
+            "likes_count": raw_data.get("likesCount", 0),
+            "timestamp": _parse_timestamp(raw_data.get("timestamp")),
+        }
+
     def parse_comment_data(self, raw_data: Dict[str, Any]) -> InstagramCommentCreate:
         """
         Parse raw Apify comment data to InstagramCommentCreate schema.
-        
+
         Args:
             raw_data: Raw comment data from Apify
-            
+
         Returns:
             InstagramCommentCreate schema
         """
-        # Parse timestamp
-        timestamp = raw_data.get("timestamp")
-        if isinstance(timestamp, str):
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            except Exception:
-                timestamp = datetime.utcnow()
-        elif timestamp is None:
-            timestamp = datetime.utcnow()
-            
-        return InstagramCommentCreate(
-            comment_id=raw_data.get("id", ""),
-            text=raw_data.get("text", ""),
-            owner_username=raw_data.get("ownerUsername", ""),
-            likes_count=raw_data.get("likesCount", 0),
-            timestamp=timestamp,
-        )
+        return InstagramCommentCreate.model_validate(self.parse_comment_fields(raw_data))
     
     def scrape_and_save_profiles(
         self, 
@@ -222,58 +417,96 @@ class ApifyService:
         Returns:
             Dictionary with results summary
         """
-        results = {
-            "success": True,
-            "accounts_created": 0,
-            "accounts_updated": 0,
-            "errors": [],
-            "data": []
-        }
-        
+        results = _ProfileResults()
+
+        # Fetch from Apify before touching the database so no connection is
+        # checked out across the multi-second remote call; the session only
+        # hits the DB once the data is already in memory.
         try:
             raw_profiles = self.scrape_profiles(
                 usernames=usernames,
                 include_about_section=include_about_section,
             )
-            
-            for raw_profile in raw_profiles:
-                try:
-                    account_data = self.parse_profile_data(raw_profile)
-                    
-                    # Check if account already exists
-                    existing = ig_account_service.get_account_by_username(db, username=account_data.username)
-                    
-                    if existing:
-                        # Update existing account
-                        from app.schemas.ig_account import InstagramAccountUpdate
-                        update_data = InstagramAccountUpdate(
-                            full_name=account_data.full_name,
-                            profile_pic_url=account_data.profile_pic_url,
-                            posts_count=account_data.posts_count,
-                            followers_count=account_data.followers_count,
-                            follows_count=account_data.follows_count,
-                            biography=account_data.biography,
-                            private=account_data.private,
-                            verified=account_data.verified,
-                            is_business_account=account_data.is_business_account,
-                        )
-                        updated = ig_account_service.update_account(db, account_id=existing.id, account_update=update_data)
-                        results["accounts_updated"] += 1
-                        results["data"].append({"id": updated.id, "username": updated.username, "action": "updated"})
-                    else:
-                        # Create new account
-                        created = ig_account_service.create_account(db, account=account_data, user_id=user_id)
-                        results["accounts_created"] += 1
-                        results["data"].append({"id": created.id, "username": created.username, "action": "created"})
-                        
-                except Exception as e:
-                    results["errors"].append(f"Error processing profile {raw_profile.get('username', 'unknown')}: {str(e)}")
-                    
         except Exception as e:
-            results["success"] = False
-            results["errors"].append(f"Apify scraping error: {str(e)}")
-            
-        return results
+            results.success = False
+            results.errors.append(f"Apify scraping error: {str(e)}")
+            return asdict(results)
+
+        self.save_profiles(db, raw_profiles, user_id, results)
+        return asdict(results)
+
+    def save_profiles(
+        self,
+        db: Session,
+        raw_profiles: List[Dict[str, Any]],
+        user_id: str,
+        results: "_ProfileResults",
+    ) -> None:
+        """
+        Persist scraped profile data, updating existing accounts in place.
+
+        One IN-list SELECT classifies existing vs. new usernames, then new
+        accounts land in a single executemany INSERT and existing ones in a
+        single executemany UPDATE keyed on the primary key — a handful of
+        round-trips per batch instead of two per profile.
+
+        Args:
+            db: Database session
+            raw_profiles: Raw profile data from Apify
+            user_id: User ID to associate accounts with
+            results: Results summary to update in place
+        """
+        # Plain field dicts feed the executemany statements directly; the
+        # data is already JSON-decoded, so a pydantic model per profile would
+        # only be constructed to read the same values back out.
+        parsed: List[Dict[str, Any]] = []
+        for raw_profile in raw_profiles:
+            try:
+                parsed.append(self.parse_profile_fields(raw_profile))
+            except Exception as e:
+                results.errors.append(f"Error processing profile {raw_profile.get('username', 'unknown')}: {str(e)}")
+
+        if not parsed:
+            return
+
+        usernames = {row["username"] for row in parsed}
+        id_by_username = dict(
+            db.exec(
+                select(InstagramAccount.username, InstagramAccount.id).where(
+                    InstagramAccount.username.in_(usernames)
+                )
+            ).all()
+        )
+
+        insert_rows: List[Dict[str, Any]] = []
+        update_rows: List[Dict[str, Any]] = []
+        for row in parsed:
+            existing_id = id_by_username.get(row["username"])
+            if existing_id is not None:
+                # Bulk UPDATE by primary key; user_id stays untouched
+                row["id"] = existing_id
+                update_rows.append(row)
+            else:
+                row["id"] = generate_cuid()
+                row["user_id"] = user_id
+                insert_rows.append(row)
+
+        if insert_rows:
+            db.execute(insert(InstagramAccount), insert_rows)
+        if update_rows:
+            db.execute(update(InstagramAccount), update_rows)
+        db.commit()
+
+        results.accounts_created += len(insert_rows)
+        results.accounts_updated += len(update_rows)
+        results.data.extend(
+            {"id": row["id"], "username": row["username"], "action": "created"}
+            for row in insert_rows
+        )
+        results.data.extend(
+            {"id": row["id"], "username": row["username"], "action": "updated"}
+            for row in update_rows
+        )
     
     def scrape_and_save_posts(
         self, 
@@ -296,13 +529,7 @@ class ApifyService:
         Returns:
             Dictionary with results summary
         """
-        results = {
-            "success": True,
-            "posts_created": 0,
-            "posts_skipped": 0,
-            "errors": [],
-            "data": []
-        }
+        results = _PostResults()
         
         try:
             raw_posts = self.scrape_posts(
@@ -312,28 +539,38 @@ class ApifyService:
                 only_posts_newer_than=only_posts_newer_than,
             )
 
-            requested_usernames = [u.lstrip("@").strip() for u in usernames if u and u.strip()]
+            # The same handful of usernames repeats across every scraped post,
+            # so normalize each distinct value once and look it up after that.
+            _norm_cache: Dict[str, str] = {}
+            _cached = _norm_cache.get
+
+            def _norm(s: str) -> str:
+                v = _cached(s)
+                if v is None:
+                    v = _norm_cache[s] = s.strip().removeprefix("@")
+                return v
+
+            requested_usernames = [_norm(u) for u in usernames if u and u.strip()]
             requested_usernames_set = set(requested_usernames)
 
-            parsed_posts: List[InstagramPostCreate] = []
+            # Field dicts, not pydantic models: the values go straight into
+            # the bulk INSERT, so per-row model construction would be pure
+            # overhead on already-decoded JSON.
+            parsed_posts: List[Dict[str, Any]] = []
             for raw_post in raw_posts:
                 try:
-                    post_data = self.parse_post_data(raw_post)
+                    post_fields = self.parse_post_fields(raw_post)
 
                     # Handle collab posts: Apify can return an ownerUsername that isn't the
                     # requested account (e.g., collaborator). In that case, prefer the source
                     # username we requested so we can associate the post to an existing account.
-                    raw_source_username = (
-                        raw_post.get("username")
-                        or raw_post.get("inputUsername")
-                        or raw_post.get("input_username")
-                    )
+                    raw_source_username = _first(raw_post, _SOURCE_USERNAME_KEYS, default=None)
                     if isinstance(raw_source_username, str):
-                        raw_source_username = raw_source_username.lstrip("@").strip()
+                        raw_source_username = _norm(raw_source_username)
                     else:
                         raw_source_username = None
 
-                    current_owner = (post_data.owner_username or "").lstrip("@").strip()
+                    current_owner = _norm(post_fields["owner_username"] or "")
                     effective_owner: Optional[str] = None
 
                     if raw_source_username and raw_source_username in requested_usernames_set:
@@ -343,114 +580,99 @@ class ApifyService:
                     elif len(requested_usernames) == 1:
                         effective_owner = requested_usernames[0]
 
-                    if effective_owner and effective_owner != post_data.owner_username:
-                        post_data.owner_username = effective_owner
+                    if effective_owner and effective_owner != post_fields["owner_username"]:
+                        post_fields["owner_username"] = effective_owner
 
-                    parsed_posts.append(post_data)
+                    parsed_posts.append(post_fields)
                 except Exception as e:
-                    results["errors"].append(f"Error processing post: {str(e)}")
+                    results.errors.append(f"Error processing post: {str(e)}")
 
             if not parsed_posts:
-                return results
+                return asdict(results)
 
-            owner_usernames = {p.owner_username for p in parsed_posts if p.owner_username}
+            owner_usernames = {p["owner_username"] for p in parsed_posts if p["owner_username"]}
             if not owner_usernames:
-                results["errors"].append("No owner usernames found in scraped posts")
-                return results
+                results.errors.append("No owner usernames found in scraped posts")
+                return asdict(results)
 
+            # Only the columns used below — id/user_id/username/full_name —
+            # come back as light Row tuples instead of full ORM instances.
             accounts = db.exec(
-                select(InstagramAccount).where(InstagramAccount.username.in_(owner_usernames))
+                select(
+                    InstagramAccount.id,
+                    InstagramAccount.user_id,
+                    InstagramAccount.username,
+                    InstagramAccount.full_name,
+                ).where(InstagramAccount.username.in_(owner_usernames))
             ).all()
             accounts_by_username = {a.username: a for a in accounts}
 
-            candidates: List[tuple[InstagramPostCreate, InstagramAccount]] = []
-            for post_data in parsed_posts:
-                account = accounts_by_username.get(post_data.owner_username)
+            candidates: List[tuple[Dict[str, Any], Any]] = []
+            for post_fields in parsed_posts:
+                account = accounts_by_username.get(post_fields["owner_username"])
                 if not account:
-                    results["errors"].append(
-                        f"Account @{post_data.owner_username} not found. Please scrape profile first."
+                    results.errors.append(
+                        f"Account @{post_fields['owner_username']} not found. Please scrape profile first."
                     )
                     continue
                 if account.user_id != user_id:
-                    results["errors"].append(
-                        f"Not authorized to add posts for @{post_data.owner_username}"
+                    results.errors.append(
+                        f"Not authorized to add posts for @{post_fields['owner_username']}"
                     )
                     continue
-                if not post_data.url:
-                    results["errors"].append(f"Post for @{post_data.owner_username} missing URL")
+                if not post_fields["url"]:
+                    results.errors.append(f"Post for @{post_fields['owner_username']} missing URL")
                     continue
-                candidates.append((post_data, account))
+                candidates.append((post_fields, account))
 
             if not candidates:
-                return results
-
-            candidate_urls = {p.url for p, _ in candidates}
-            existing_urls = set(
-                db.exec(
-                    select(InstagramPost.url).where(InstagramPost.url.in_(candidate_urls))
-                ).all()
-            )
-
-            new_posts: List[InstagramPost] = []
-            for post_data, account in candidates:
-                if post_data.url in existing_urls:
-                    results["posts_skipped"] += 1
-                    continue
-                new_posts.append(
-                    InstagramPost(
-                        instagram_account_id=account.id,
-                        caption=post_data.caption,
-                        owner_full_name=account.full_name,
-                        owner_username=post_data.owner_username,
-                        display_url=post_data.display_url,
-                        video_url=post_data.video_url,
-                        url=post_data.url,
-                        likes_count=post_data.likes_count,
-                        comments_count=post_data.comments_count,
-                        first_comment=post_data.first_comment,
-                        timestamp=post_data.timestamp,
-                    )
-                )
+                return asdict(results)
 
-            if not new_posts:
-                return results
-
-            # Capture payload before commit to avoid N+1 refresh queries after commit
-            posts_data_before_commit = [
-                {"id": p.id, "url": p.url, "account_username": p.owner_username}
-                for p in new_posts
+            rows = [
+                {
+                    **post_fields,
+                    "id": generate_cuid(),
+                    "instagram_account_id": account.id,
+                    "owner_full_name": account.full_name,
+                }
+                for post_fields, account in candidates
             ]
 
-            def _commit_posts_batch() -> None:
-                db.add_all(new_posts)
-                db.commit()
-
-            try:
-                _commit_posts_batch()
-            except IntegrityError:
-                db.rollback()
-                # Retry once after re-checking existing URLs (handles races)
-                existing_urls_retry = set(
-                    db.exec(
-                        select(InstagramPost.url).where(InstagramPost.url.in_(candidate_urls))
-                    ).all()
+            # INSERT .. ON CONFLICT (url) DO NOTHING lets the database drop
+            # duplicates atomically: no pre-SELECT of existing URLs and no
+            # IntegrityError retry window for concurrent scrapes. Both
+            # backends we run on (PostgreSQL, sqlite in tests) support the
+            # construct, but each has its own insert() flavor.
+            if db.get_bind().dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as conflict_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as conflict_insert
+
+            inserted = []
+            for i in range(0, len(rows), 500):
+                stmt = (
+                    conflict_insert(InstagramPost)
+                    .values(rows[i:i + 500])
+                    .on_conflict_do_nothing(index_elements=["url"])
+                    .returning(
+                        InstagramPost.id, InstagramPost.url, InstagramPost.owner_username
+                    )
                 )
-                new_posts[:] = [p for p in new_posts if p.url not in existing_urls_retry]
-                posts_data_before_commit[:] = [
-                    {"id": p.id, "url": p.url, "account_username": p.owner_username}
-                    for p in new_posts
-                ]
-                if new_posts:
-                    _commit_posts_batch()
-
-            results["posts_created"] += len(new_posts)
-            results["data"].extend(posts_data_before_commit)
+                inserted.extend(db.execute(stmt).all())
+            db.commit()
+
+            results.posts_created += len(inserted)
+            results.posts_skipped += len(rows) - len(inserted)
+            results.data.extend(
+                {"id": post_id, "url": url, "account_username": owner_username}
+                for post_id, url, owner_username in inserted
+            )
 
         except Exception as e:
-            results["success"] = False
-            results["errors"].append(f"Apify scraping error: {str(e)}")
+            results.success = False
+            results.errors.append(f"Apify scraping error: {str(e)}")
 
-        return results
+        return asdict(results)
     
     def scrape_and_save_comments(
         self, 
@@ -473,13 +695,7 @@ class ApifyService:
         Returns:
             Dictionary with results summary
         """
-        results = {
-            "success": True,
-            "comments_created": 0,
-            "comments_skipped": 0,
-            "errors": [],
-            "data": []
-        }
+        results = _CommentResults()
         
         try:
             raw_comments = self.scrape_comments(
@@ -489,130 +705,117 @@ class ApifyService:
                 include_nested_comments=include_nested_comments,
             )
 
-            parsed_comments: List[tuple[InstagramCommentCreate, str]] = []
+            comment_rows: List[Dict[str, Any]] = []
+            row_post_urls: List[str] = []
+            # Usernames and post URLs repeat heavily within one scrape but
+            # each arrives as a fresh str from the JSON parse; a per-scrape
+            # dedupe dict collapses the duplicates to one object each without
+            # pinning external strings in the intern table for the process
+            # lifetime.
+            seen_strings: Dict[str, str] = {}
+            dedupe = seen_strings.setdefault
             for raw_comment in raw_comments:
                 try:
-                    comment_data = self.parse_comment_data(raw_comment)
-                    post_url = raw_comment.get("postUrl") or raw_comment.get("inputUrl")
+                    fields = self.parse_comment_fields(raw_comment)
+                    post_url = _first(raw_comment, _POST_URL_KEYS, default=None)
                     if not post_url:
-                        results["errors"].append("Comment missing post URL reference")
+                        results.errors.append("Comment missing post URL reference")
                         continue
-                    if not comment_data.comment_id:
-                        results["errors"].append(f"Comment missing comment_id for post: {post_url}")
+                    if not fields["comment_id"]:
+                        results.errors.append(f"Comment missing comment_id for post: {post_url}")
                         continue
-                    parsed_comments.append((comment_data, post_url))
+                    fields["owner_username"] = dedupe(
+                        fields["owner_username"], fields["owner_username"]
+                    )
+                    comment_rows.append(fields)
+                    row_post_urls.append(dedupe(post_url, post_url))
                 except Exception as e:
-                    results["errors"].append(f"Error processing comment: {str(e)}")
+                    results.errors.append(f"Error processing comment: {str(e)}")
+
+            if not comment_rows:
+                return asdict(results)
 
-            if not parsed_comments:
-                return results
+            # The field dicts feed the bulk INSERT as-is — the data was just
+            # JSON-decoded and parse_comment_fields already coerced every
+            # value, so validating through the schema adds nothing here.
+            parsed_comments = list(zip(comment_rows, row_post_urls))
 
+            # One JOINed column-tuple select answers both "does the post
+            # exist" and "who owns it", so authorization needs no second
+            # account lookup.
             comment_post_urls = {post_url for _, post_url in parsed_comments}
             posts = db.exec(
-                select(InstagramPost).where(InstagramPost.url.in_(comment_post_urls))
+                select(InstagramPost.id, InstagramPost.url, InstagramAccount.user_id)
+                .join(InstagramAccount, InstagramAccount.id == InstagramPost.instagram_account_id)
+                .where(InstagramPost.url.in_(comment_post_urls))
             ).all()
             posts_by_url = {p.url: p for p in posts}
 
-            account_ids = {p.instagram_account_id for p in posts}
-            accounts = db.exec(
-                select(InstagramAccount).where(InstagramAccount.id.in_(account_ids))
-            ).all()
-            accounts_by_id = {a.id: a for a in accounts}
-
-            candidates: List[tuple[InstagramCommentCreate, InstagramPost, str]] = []
-            for comment_data, post_url in parsed_comments:
+            candidates: List[tuple[Dict[str, Any], Any, str]] = []
+            for comment_fields, post_url in parsed_comments:
                 post = posts_by_url.get(post_url)
                 if not post:
-                    results["errors"].append(f"Post not found for URL: {post_url}")
-                    continue
-                account = accounts_by_id.get(post.instagram_account_id)
-                if not account:
-                    results["errors"].append(f"Account not found for post: {post_url}")
+                    results.errors.append(f"Post not found for URL: {post_url}")
                     continue
-                if account.user_id != user_id:
-                    results["errors"].append(f"Not authorized to add comments to post: {post_url}")
+                if post.user_id != user_id:
+                    results.errors.append(f"Not authorized to add comments to post: {post_url}")
                     continue
-                candidates.append((comment_data, post, post_url))
+                candidates.append((comment_fields, post, post_url))
 
             if not candidates:
-                return results
-
-            candidate_comment_ids = {c.comment_id for c, _, _ in candidates}
-            existing_comment_ids = set(
-                db.exec(
-                    select(InstagramComment.comment_id).where(
-                        InstagramComment.comment_id.in_(candidate_comment_ids)
-                    )
-                ).all()
-            )
-
-            new_comments: List[InstagramComment] = []
-            for comment_data, post, post_url in candidates:
-                if comment_data.comment_id in existing_comment_ids:
-                    results["comments_skipped"] += 1
-                    continue
-                new_comments.append(
-                    InstagramComment(
-                        instagram_post_id=post.id,
-                        comment_id=comment_data.comment_id,
-                        text=comment_data.text,
-                        owner_username=comment_data.owner_username,
-                        likes_count=comment_data.likes_count,
-                        timestamp=comment_data.timestamp,
-                    )
-                )
+                return asdict(results)
 
-            if not new_comments:
-                return results
-
-            # Build post_url lookup for result payload
-            post_url_by_post_id = {p.id: url for url, p in posts_by_url.items()}
-
-            # Capture payload before commit to avoid N+1 refresh queries after commit
-            comments_data_before_commit = [
+            rows = [
                 {
-                    "id": c.id,
-                    "comment_id": c.comment_id,
-                    "post_url": post_url_by_post_id.get(c.instagram_post_id),
+                    **comment_fields,
+                    "id": generate_cuid(),
+                    "instagram_post_id": post.id,
                 }
-                for c in new_comments
+                for comment_fields, post, post_url in candidates
             ]
 
-            def _commit_comments_batch() -> None:
-                db.add_all(new_comments)
-                db.commit()
+            # Build post_url lookup for result payload
+            post_url_by_post_id = {p.id: url for url, p in posts_by_url.items()}
 
-            try:
-                _commit_comments_batch()
-            except IntegrityError:
-                db.rollback()
-                existing_comment_ids_retry = set(
-                    db.exec(
-                        select(InstagramComment.comment_id).where(
-                            InstagramComment.comment_id.in_(candidate_comment_ids)
-                        )
-                    ).all()
+            # As with posts: ON CONFLICT (comment_id) DO NOTHING dedupes
+            # atomically in the database, replacing the pre-SELECT and the
+            # IntegrityError retry path.
+            if db.get_bind().dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as conflict_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as conflict_insert
+
+            inserted = []
+            for i in range(0, len(rows), 500):
+                stmt = (
+                    conflict_insert(InstagramComment)
+                    .values(rows[i:i + 500])
+                    .on_conflict_do_nothing(index_elements=["comment_id"])
+                    .returning(
+                        InstagramComment.id,
+                        InstagramComment.comment_id,
+                        InstagramComment.instagram_post_id,
+                    )
                 )
-                new_comments[:] = [c for c in new_comments if c.comment_id not in existing_comment_ids_retry]
-                comments_data_before_commit[:] = [
-                    {
-                        "id": c.id,
-                        "comment_id": c.comment_id,
-                        "post_url": post_url_by_post_id.get(c.instagram_post_id),
-                    }
-                    for c in new_comments
-                ]
-                if new_comments:
-                    _commit_comments_batch()
-
-            results["comments_created"] += len(new_comments)
-            results["data"].extend(comments_data_before_commit)
+                inserted.extend(db.execute(stmt).all())
+            db.commit()
+
+            results.comments_created += len(inserted)
+            results.comments_skipped += len(rows) - len(inserted)
+            results.data.extend(
+                {
+                    "id": row_id,
+                    "comment_id": comment_id,
+                    "post_url": post_url_by_post_id.get(post_id),
+                }
+                for row_id, comment_id, post_id in inserted
+            )
 
         except Exception as e:
-            results["success"] = False
-            results["errors"].append(f"Apify scraping error: {str(e)}")
+            results.success = False
+            results.errors.append(f"Apify scraping error: {str(e)}")
 
-        return results
+        return asdict(results)
 
 
 # Singleton instance
@@ -0,0 +1,35 @@
+"""Short-TTL cache for post ownership lookups.
+
+Every guarded endpoint re-resolves post -> account.user_id with fresh
+SELECTs even though ownership effectively never changes. Cache the mapping
+briefly so repeat calls authorize from memory instead of the database.
+"""
+
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlmodel import Session
+
+from app.services import ig_post_service
+
+# post_id -> owning account's user_id. The TTL bounds how long a stale
+# ownership answer can survive a delete that bypassed invalidation.
+_owner_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+
+def get_post_owner(db: Session, post_id: str) -> Optional[str]:
+    """Resolve the user_id that owns a post, or None if the post is missing."""
+    owner = _owner_cache.get(post_id)
+    if owner is None:
+        row = ig_post_service.get_post_with_owner(db, post_id=post_id)
+        if row is None:
+            # Never cache misses; the post may be created right after
+            return None
+        _, owner = row
+        _owner_cache[post_id] = owner
+    return owner
+
+
+def invalidate_post_owner(post_id: str) -> None:
+    """Drop a cached owner after the post is deleted."""
+    _owner_cache.pop(post_id, None)
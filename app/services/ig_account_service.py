@@ -1,11 +1,18 @@
-from datetime import datetime
 from typing import Optional, List
 
+from cachetools import TTLCache
+from sqlalchemy import update
 from sqlmodel import Session, select
 
 from app.models.ig_account import InstagramAccount
 from app.schemas.ig_account import InstagramAccountCreate, InstagramAccountUpdate
 
+# username -> account id. Only the id mapping is cached — the row itself is
+# always fetched through db.get on the caller's session, so no ORM state
+# leaks across sessions and a hit turns the username SELECT into a primary-key
+# lookup served by the identity map when the row is already loaded.
+_account_id_cache: TTLCache = TTLCache(maxsize=1000, ttl=60)
+
 
 def get_account_by_id(db: Session, account_id: str) -> Optional[InstagramAccount]:
     """Get an Instagram account by ID."""
@@ -14,8 +21,18 @@ def get_account_by_id(db: Session, account_id: str) -> Optional[InstagramAccount
 
 def get_account_by_username(db: Session, username: str) -> Optional[InstagramAccount]:
     """Get an Instagram account by username."""
+    account_id = _account_id_cache.get(username)
+    if account_id is not None:
+        account = db.get(InstagramAccount, account_id)
+        if account is not None and account.username == username:
+            return account
+        _account_id_cache.pop(username, None)
+
     statement = select(InstagramAccount).where(InstagramAccount.username == username)
-    return db.exec(statement).first()
+    account = db.exec(statement).first()
+    if account is not None:
+        _account_id_cache[username] = account.id
+    return account
 
 
 def get_accounts_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 100) -> List[InstagramAccount]:
@@ -50,32 +67,56 @@ def create_account(db: Session, account: InstagramAccountCreate, user_id: str) -
     db.add(db_account)
     db.commit()
     db.refresh(db_account)
+    _account_id_cache[db_account.username] = db_account.id
     return db_account
 
 
 def update_account(db: Session, account_id: str, account_update: InstagramAccountUpdate) -> Optional[InstagramAccount]:
     """Update an Instagram account."""
-    db_account = get_account_by_id(db, account_id)
-    if not db_account:
-        return None
-    
     update_data = account_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_account, key, value)
-    
-    db_account.updated_at = datetime.utcnow()
-    db.add(db_account)
+
+    # updated_at diisi DB lewat onupdate=func.now() pada kolomnya.
+    # One UPDATE instead of load + per-attribute setattr + flush; rowcount
+    # doubles as the existence check, so the SELECT only runs on success.
+    result = db.execute(
+        update(InstagramAccount)
+        .where(InstagramAccount.id == account_id)
+        .values(**update_data)
+    )
     db.commit()
-    db.refresh(db_account)
+    if result.rowcount == 0:
+        return None
+
+    if "username" in update_data:
+        # The old username is unknown here; drop any cache entry still
+        # pointing at this account. Renames are rare, the scan is bounded.
+        for cached_username in [u for u, i in _account_id_cache.items() if i == account_id]:
+            _account_id_cache.pop(cached_username, None)
+
+    db_account = db.get(InstagramAccount, account_id)
+    if db_account is not None:
+        _account_id_cache[db_account.username] = db_account.id
     return db_account
 
 
+def update_accounts_bulk(db: Session, updates: List[dict]) -> None:
+    """Apply many account updates in one executemany UPDATE keyed on id.
+
+    Each dict must carry the primary key under "id" plus the columns to set.
+    """
+    if not updates:
+        return
+    db.execute(update(InstagramAccount), updates)
+    db.commit()
+
+
 def delete_account(db: Session, account_id: str) -> bool:
     """Delete an Instagram account."""
     db_account = get_account_by_id(db, account_id)
     if not db_account:
         return False
-    
+
+    _account_id_cache.pop(db_account.username, None)
     db.delete(db_account)
     db.commit()
     return True
@@ -1,9 +1,12 @@
-from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Mapping, Optional, List, Tuple
 
+from sqlalchemy import tuple_, update
 from sqlmodel import Session, select
 
+from app.models.ids import generate_cuid
+from app.models.ig_account import InstagramAccount
 from app.models.ig_comment import InstagramComment
+from app.models.ig_post import InstagramPost
 from app.schemas.ig_comment import InstagramCommentCreate, InstagramCommentUpdate
 
 
@@ -12,18 +15,109 @@ def get_comment_by_id(db: Session, comment_id: str) -> Optional[InstagramComment
     return db.get(InstagramComment, comment_id)
 
 
+def get_comment_with_owner(db: Session, comment_id: str) -> Optional[Tuple[InstagramComment, str]]:
+    """Get a comment plus its owning account's user_id in a single JOINed query."""
+    statement = (
+        select(InstagramComment, InstagramAccount.user_id)
+        .join(InstagramPost, InstagramPost.id == InstagramComment.instagram_post_id)
+        .join(InstagramAccount, InstagramAccount.id == InstagramPost.instagram_account_id)
+        .where(InstagramComment.id == comment_id)
+    )
+    return db.exec(statement).first()
+
+
 def get_comment_by_comment_id(db: Session, comment_id: str) -> Optional[InstagramComment]:
     """Get an Instagram comment by Instagram comment ID."""
     statement = select(InstagramComment).where(InstagramComment.comment_id == comment_id)
     return db.exec(statement).first()
 
 
-def get_comments_by_post(db: Session, post_id: str, skip: int = 0, limit: int = 100) -> List[InstagramComment]:
-    """Get all Instagram comments for a post."""
-    statement = select(InstagramComment).where(
+def get_comments_by_post(
+    db: Session,
+    post_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[str] = None
+) -> List[Mapping]:
+    """Get Instagram comments for a post as plain column mappings.
+
+    Pass after_id (id of the last row seen) for keyset pagination
+    (constant cost at any depth); skip remains as an OFFSET fallback for
+    older clients. Every page is ordered newest-first on the composite
+    key (timestamp DESC, id DESC) — ids are random uuid4 hex, so they
+    only serve as a tie-breaker that makes the order total, never as the
+    sort key itself. The anchor row's timestamp is fetched with one PK
+    lookup; a vanished anchor ends the scan. Rows come back as mappings
+    rather than ORM instances: the list endpoint only serializes them,
+    so there's no reason to pay identity-map bookkeeping and per-field
+    attribute probes on every row.
+    """
+    columns = InstagramComment.__table__.columns
+    statement = select(*columns).where(
         InstagramComment.instagram_post_id == post_id
-    ).order_by(InstagramComment.timestamp.desc()).offset(skip).limit(limit)
-    return db.exec(statement).all()
+    )
+    if after_id is not None:
+        anchor_ts = db.execute(
+            select(InstagramComment.timestamp).where(InstagramComment.id == after_id)
+        ).scalar_one_or_none()
+        if anchor_ts is None:
+            return []
+        statement = statement.where(
+            tuple_(InstagramComment.timestamp, InstagramComment.id) < (anchor_ts, after_id)
+        )
+    elif skip:
+        statement = statement.offset(skip)
+    statement = statement.order_by(
+        InstagramComment.timestamp.desc(), InstagramComment.id.desc()
+    ).limit(limit)
+    return db.execute(statement).mappings().all()
+
+
+def iter_comments_by_post(db: Session, post_id: str, chunk_size: int = 256) -> Iterator[List[InstagramComment]]:
+    """Yield a post's comments in id-keyed pages so callers never hold them all.
+
+    Ids are random uuid4 hex, so the pages arrive in arbitrary order —
+    fine here: id is just a stable total order that guarantees every row
+    is visited exactly once.
+    """
+    last_id: Optional[str] = None
+    while True:
+        statement = select(InstagramComment).where(
+            InstagramComment.instagram_post_id == post_id
+        )
+        if last_id is not None:
+            statement = statement.where(InstagramComment.id > last_id)
+        statement = statement.order_by(InstagramComment.id).limit(chunk_size)
+
+        chunk = db.exec(statement).all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def iter_comment_texts_by_post(db: Session, post_id: str, chunk_size: int = 256) -> Iterator[List[Tuple[str, str]]]:
+    """Yield a post's (id, text) pairs in id-keyed pages.
+
+    Column tuples instead of ORM instances: the sentiment pipeline only
+    reads the text and writes back by id, so there's no reason to build
+    a full InstagramComment object per row. Id order is arbitrary
+    (uuid4 hex) but stable and total, which is all the pipeline needs.
+    """
+    last_id: Optional[str] = None
+    while True:
+        statement = select(InstagramComment.id, InstagramComment.text).where(
+            InstagramComment.instagram_post_id == post_id
+        )
+        if last_id is not None:
+            statement = statement.where(InstagramComment.id > last_id)
+        statement = statement.order_by(InstagramComment.id).limit(chunk_size)
+
+        chunk = db.exec(statement).all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
 
 
 def get_comments(db: Session, skip: int = 0, limit: int = 100) -> List[InstagramComment]:
@@ -49,29 +143,42 @@ def create_comment(db: Session, comment: InstagramCommentCreate, post_id: str) -
 
 
 def create_comments_bulk(db: Session, comments: List[InstagramCommentCreate], post_id: str) -> List[InstagramComment]:
-    """Create multiple Instagram comments at once."""
-    db_comments = []
-    for comment in comments:
-        # Skip if comment already exists
-        existing = get_comment_by_comment_id(db, comment.comment_id)
-        if existing:
-            continue
-            
-        db_comment = InstagramComment(
-            instagram_post_id=post_id,
-            comment_id=comment.comment_id,
-            text=comment.text,
-            owner_username=comment.owner_username,
-            likes_count=comment.likes_count,
-            timestamp=comment.timestamp
+    """Create multiple Instagram comments with multi-row INSERTs."""
+    rows = [
+        {
+            "id": generate_cuid(),
+            "instagram_post_id": post_id,
+            "comment_id": comment.comment_id,
+            "text": comment.text,
+            "owner_username": comment.owner_username,
+            "likes_count": comment.likes_count,
+            "timestamp": comment.timestamp,
+        }
+        for comment in comments
+    ]
+
+    if not rows:
+        return []
+
+    # ON CONFLICT (comment_id) DO NOTHING dedupes in the database instead of
+    # a preliminary SELECT, and RETURNING hands back the inserted rows in the
+    # same round trip — no re-SELECT by id after the commit.
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as conflict_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as conflict_insert
+
+    inserted: List[InstagramComment] = []
+    for i in range(0, len(rows), 1000):
+        stmt = (
+            conflict_insert(InstagramComment)
+            .values(rows[i:i + 1000])
+            .on_conflict_do_nothing(index_elements=["comment_id"])
+            .returning(InstagramComment)
         )
-        db.add(db_comment)
-        db_comments.append(db_comment)
-    
+        inserted.extend(db.execute(stmt).scalars().all())
     db.commit()
-    for db_comment in db_comments:
-        db.refresh(db_comment)
-    return db_comments
+    return inserted
 
 
 def update_comment(db: Session, comment_id: str, comment_update: InstagramCommentUpdate) -> Optional[InstagramComment]:
@@ -83,8 +190,8 @@ def update_comment(db: Session, comment_id: str, comment_update: InstagramCommen
     update_data = comment_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_comment, key, value)
-    
-    db_comment.updated_at = datetime.utcnow()
+
+    # updated_at diisi DB lewat onupdate=func.now() pada kolomnya
     db.add(db_comment)
     db.commit()
     db.refresh(db_comment)
@@ -102,9 +209,52 @@ def delete_comment(db: Session, comment_id: str) -> bool:
     return True
 
 
-def get_comments_without_sentiment(db: Session, limit: int = 100) -> List[InstagramComment]:
-    """Get comments that don't have sentiment analysis yet."""
+def get_comments_without_sentiment(
+    db: Session,
+    limit: int = 100,
+    after_id: Optional[str] = None
+) -> List[InstagramComment]:
+    """Get comments that don't have sentiment analysis yet.
+
+    Scoring loops pass the last seen id back as after_id so each call
+    resumes where the previous page ended instead of re-scanning the
+    same unlabeled prefix; the partial ix_comments_unlabeled index makes
+    this an index range scan.
+    """
     statement = select(InstagramComment).where(
-        InstagramComment.sentiment_label == None
-    ).limit(limit)
+        InstagramComment.sentiment_label.is_(None)
+    )
+    if after_id is not None:
+        statement = statement.where(InstagramComment.id > after_id)
+    statement = statement.order_by(InstagramComment.id).limit(limit)
     return db.exec(statement).all()
+
+
+def get_unlabeled_texts(
+    db: Session,
+    limit: int = 100,
+    after_id: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """Get (id, text) pairs for comments without sentiment, as plain tuples.
+
+    Keyset-paged the same way as get_comments_without_sentiment.
+    """
+    statement = select(InstagramComment.id, InstagramComment.text).where(
+        InstagramComment.sentiment_label.is_(None)
+    )
+    if after_id is not None:
+        statement = statement.where(InstagramComment.id > after_id)
+    statement = statement.order_by(InstagramComment.id).limit(limit)
+    return db.exec(statement).all()
+
+
+def update_sentiments_bulk(db: Session, mappings: List[dict]) -> None:
+    """Bulk UPDATE sentiment columns via executemany; caller commits.
+
+    Each mapping carries the comment "id" plus the sentiment fields to
+    set, so a whole chunk goes out as one batched statement instead of
+    per-row UPDATEs.
+    """
+    if not mappings:
+        return
+    db.execute(update(InstagramComment), mappings)
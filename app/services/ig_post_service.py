@@ -1,8 +1,10 @@
-from datetime import datetime
-from typing import Optional, List
+from typing import Mapping, Optional, List, Tuple
 
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 
+from app.models.ids import generate_cuid
+from app.models.ig_account import InstagramAccount
 from app.models.ig_post import InstagramPost
 from app.schemas.ig_post import InstagramPostCreate, InstagramPostUpdate
 
@@ -12,18 +14,61 @@ def get_post_by_id(db: Session, post_id: str) -> Optional[InstagramPost]:
     return db.get(InstagramPost, post_id)
 
 
+def get_post_with_owner(db: Session, post_id: str) -> Optional[Tuple[InstagramPost, str]]:
+    """Get a post plus its owning account's user_id in a single JOINed query."""
+    statement = (
+        select(InstagramPost, InstagramAccount.user_id)
+        .join(InstagramAccount, InstagramAccount.id == InstagramPost.instagram_account_id)
+        .where(InstagramPost.id == post_id)
+    )
+    return db.exec(statement).first()
+
+
 def get_post_by_url(db: Session, url: str) -> Optional[InstagramPost]:
     """Get an Instagram post by URL."""
     statement = select(InstagramPost).where(InstagramPost.url == url)
     return db.exec(statement).first()
 
 
-def get_posts_by_account(db: Session, account_id: str, skip: int = 0, limit: int = 100) -> List[InstagramPost]:
-    """Get all Instagram posts for an account."""
-    statement = select(InstagramPost).where(
+def get_posts_by_account(
+    db: Session,
+    account_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[str] = None
+) -> List[Mapping]:
+    """Get Instagram posts for an account as plain column mappings.
+
+    Pass after_id (id of the last row seen) for keyset pagination
+    (constant cost at any depth); skip remains as an OFFSET fallback for
+    older clients. Every page is ordered newest-first on the composite
+    key (timestamp DESC, id DESC) — ids are random uuid4 hex, so they
+    only serve as a tie-breaker that makes the order total, never as the
+    sort key itself. The anchor row's timestamp is fetched with one PK
+    lookup; a vanished anchor ends the scan. Rows come back as mappings
+    rather than ORM instances: the list endpoint only serializes them,
+    so there's no reason to pay identity-map bookkeeping and per-field
+    attribute probes on every row.
+    """
+    columns = InstagramPost.__table__.columns
+    statement = select(*columns).where(
         InstagramPost.instagram_account_id == account_id
-    ).order_by(InstagramPost.timestamp.desc()).offset(skip).limit(limit)
-    return db.exec(statement).all()
+    )
+    if after_id is not None:
+        anchor_ts = db.execute(
+            select(InstagramPost.timestamp).where(InstagramPost.id == after_id)
+        ).scalar_one_or_none()
+        if anchor_ts is None:
+            return []
+        statement = statement.where(
+            tuple_(InstagramPost.timestamp, InstagramPost.id) < (anchor_ts, after_id)
+        )
+    elif skip:
+        statement = statement.offset(skip)
+    statement = statement.order_by(
+        InstagramPost.timestamp.desc(), InstagramPost.id.desc()
+    ).limit(limit)
+    return db.execute(statement).mappings().all()
 
 
 def get_posts(db: Session, skip: int = 0, limit: int = 100) -> List[InstagramPost]:
@@ -54,29 +99,47 @@ def create_post(db: Session, post: InstagramPostCreate, account_id: str) -> Inst
 
 
 def create_posts_bulk(db: Session, posts: List[InstagramPostCreate], account_id: str) -> List[InstagramPost]:
-    """Create multiple Instagram posts at once."""
-    db_posts = []
-    for post in posts:
-        db_post = InstagramPost(
-            instagram_account_id=account_id,
-            caption=post.caption,
-            owner_full_name=post.owner_full_name,
-            owner_username=post.owner_username,
-            display_url=post.display_url,
-            video_url=post.video_url,
-            url=post.url,
-            likes_count=post.likes_count,
-            comments_count=post.comments_count,
-            first_comment=post.first_comment,
-            timestamp=post.timestamp
+    """Create multiple Instagram posts with multi-row INSERTs."""
+    rows = [
+        {
+            "id": generate_cuid(),
+            "instagram_account_id": account_id,
+            "caption": post.caption,
+            "owner_full_name": post.owner_full_name,
+            "owner_username": post.owner_username,
+            "display_url": post.display_url,
+            "video_url": post.video_url,
+            "url": post.url,
+            "likes_count": post.likes_count,
+            "comments_count": post.comments_count,
+            "first_comment": post.first_comment,
+            "timestamp": post.timestamp,
+        }
+        for post in posts
+    ]
+
+    if not rows:
+        return []
+
+    # ON CONFLICT (url) DO NOTHING dedupes in the database instead of a
+    # preliminary SELECT, and RETURNING hands back the inserted rows in the
+    # same round trip — no re-SELECT by id after the commit.
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as conflict_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as conflict_insert
+
+    inserted: List[InstagramPost] = []
+    for i in range(0, len(rows), 1000):
+        stmt = (
+            conflict_insert(InstagramPost)
+            .values(rows[i:i + 1000])
+            .on_conflict_do_nothing(index_elements=["url"])
+            .returning(InstagramPost)
         )
-        db.add(db_post)
-        db_posts.append(db_post)
-    
+        inserted.extend(db.execute(stmt).scalars().all())
     db.commit()
-    for db_post in db_posts:
-        db.refresh(db_post)
-    return db_posts
+    return inserted
 
 
 def update_post(db: Session, post_id: str, post_update: InstagramPostUpdate) -> Optional[InstagramPost]:
@@ -88,8 +151,8 @@ def update_post(db: Session, post_id: str, post_update: InstagramPostUpdate) ->
     update_data = post_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_post, key, value)
-    
-    db_post.updated_at = datetime.utcnow()
+
+    # updated_at diisi DB lewat onupdate=func.now() pada kolomnya
     db.add(db_post)
     db.commit()
     db.refresh(db_post)
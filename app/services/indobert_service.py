@@ -6,11 +6,12 @@ yang sudah di-fine-tune dan di-export ke format ONNX.
 """
 
 import json
+import os
 import re
 import unicodedata
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
 import onnxruntime as ort
@@ -67,16 +68,27 @@ EMOJI_DICT = {
 }
 
 
+# Pattern dikompilasi sekali di module level supaya tiap panggilan
+# preprocess tidak membayar re.compile ulang. Emoji dan slang digabung
+# jadi satu alternation sehingga seluruh dict diganti dalam satu pass.
+_URL_RE = re.compile(r'http\S+|www\S+')
+_TAG_RE = re.compile(r'[@#](\w+)')
+_PUNCT_RE = re.compile(r'[^\w\s]', re.UNICODE)
+_ELONG_RE = re.compile(r'(.)\1{2,}')
+_EMOJI_RE = re.compile('|'.join(map(re.escape, EMOJI_DICT)))
+_SLANG_RE = re.compile(r'\b(' + '|'.join(map(re.escape, SLANG_DICT)) + r')\b')
+# Teks pendek yang cuma huruf/angka/spasi tidak butuh clean_text sama sekali
+_PLAIN_RE = re.compile(r'[A-Za-z0-9\s]+\Z')
+
+
 def convert_emoji_to_text(text: str) -> str:
     """Convert emoji to sentiment text."""
-    for emoji_char, sentiment in EMOJI_DICT.items():
-        text = text.replace(emoji_char, f' {sentiment} ')
-    return text
+    return _EMOJI_RE.sub(lambda m: f' {EMOJI_DICT[m.group(0)]} ', text)
 
 
 def remove_elongation(word: str) -> str:
     """Remove repeated characters (e.g., enakkk -> enak)."""
-    return re.sub(r'(.)\1{2,}', r'\1\1', word)
+    return _ELONG_RE.sub(r'\1\1', word)
 
 
 def clean_text(text: str) -> str:
@@ -86,30 +98,40 @@ def clean_text(text: str) -> str:
     # Convert emoji to text first
     text = convert_emoji_to_text(text)
     # Hapus URL
-    text = re.sub(r'http\S+|www\S+', ' ', text)
+    text = _URL_RE.sub(' ', text)
     # Hapus mention & hashtag (tapi keep textnya)
-    text = re.sub(r'[@#](\w+)', r'\1', text)
+    text = _TAG_RE.sub(r'\1', text)
     # Hapus special characters (keep unicode letters)
-    text = re.sub(r'[^\w\s]', ' ', text, flags=re.UNICODE)
-    # Rapikan spasi
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    text = _PUNCT_RE.sub(' ', text)
+    # Rapikan spasi: split() tanpa argumen sudah collapse + strip di C
+    return ' '.join(text.split())
 
 
 def normalize_text(text: str) -> str:
     """Normalize text with lowercasing and slang conversion."""
     text = text.lower()
-    words = text.split()
-    normalized = []
-    for w in words:
-        w = remove_elongation(w)
-        w = SLANG_DICT.get(w, w)
-        normalized.append(w)
-    return ' '.join(normalized)
+    # Hilangkan elongasi dulu supaya varian seperti 'enakkk' jatuh ke kunci
+    # slang 'enakk'; \b menjamin hanya kata utuh yang tersubstitusi.
+    text = _ELONG_RE.sub(r'\1\1', text)
+    text = _SLANG_RE.sub(lambda m: SLANG_DICT[m.group(1)], text)
+    return ' '.join(text.split())
 
 
+@lru_cache(maxsize=131072)
 def preprocess_text(text: str) -> str:
-    """Full preprocessing pipeline (sama persis dengan notebook)."""
+    """Full preprocessing pipeline (sama persis dengan notebook).
+
+    Komentar Instagram banyak duplikatnya ("bagus", "mantap", dst), jadi
+    hasilnya di-memo per proses supaya teks yang sama tidak membayar
+    regex/slang berulang kali.
+    """
+    # Fast path: komentar pendek alfanumerik (mayoritas trafik) tidak punya
+    # URL/mention/emoji/tanda baca, jadi clean_text bisa dilewati. Guard
+    # http/www perlu karena _URL_RE juga menghapus token tanpa tanda baca.
+    if len(text) < 64 and text.isascii() and _PLAIN_RE.match(text):
+        lowered = text.lower()
+        if 'http' not in lowered and 'www' not in lowered:
+            return normalize_text(lowered)
     text = clean_text(text)
     text = normalize_text(text)
     return text
@@ -121,7 +143,10 @@ def preprocess_text(text: str) -> str:
 
 class IndoBertSentimentModel:
     """Wrapper class for IndoBERT ONNX model inference."""
-    
+
+    # Ukuran sub-batch per panggilan ONNX saat bucketing berdasarkan panjang
+    BUCKET_SIZE = 32
+
     def __init__(self, model_dir: str):
         self.model_dir = Path(model_dir)
         self._load_config()
@@ -137,29 +162,109 @@ class IndoBertSentimentModel:
         self.id2label = {int(k): v for k, v in config.get("id2label", {}).items()}
         self.label2id = config.get("label2id", {})
         self.num_labels = len(self.id2label)
+        # Daftar label berurutan, dihitung sekali: predict membangun dict
+        # hasil per baris dan tidak perlu lookup id2label berulang
+        self._labels = [self.id2label[i] for i in range(self.num_labels)]
     
     def _load_tokenizer(self):
         """Load tokenizer from model directory."""
         self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        # Cache per instance (bukan decorator di class) supaya key cache
+        # tidak menyertakan self dan cache ikut umur model singleton.
+        self._tokenize_one = lru_cache(maxsize=65536)(self._tokenize_one_uncached)
+
+    def _tokenize_one_uncached(self, text: str) -> Tuple[int, ...]:
+        """Tokenize satu teks tanpa padding (max_length sama dengan training)."""
+        return tuple(self.tokenizer(text, truncation=True, max_length=128)["input_ids"])
     
+    def _quantize_for_cpu(self, onnx_path: Path) -> Optional[Path]:
+        """Get a dynamic-int8 copy of the model, generating it once.
+
+        Returns None (keep FP32) when the quantization tooling is not
+        installed or the conversion fails.
+        """
+        quant_path = onnx_path.with_name("model.quant.onnx")
+        if quant_path.exists():
+            return quant_path
+
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            return None
+
+        try:
+            quantize_dynamic(str(onnx_path), str(quant_path), weight_type=QuantType.QInt8)
+        except Exception as e:
+            print(f"Warning: int8 quantization skipped: {e}")
+            return None
+        return quant_path
+
     def _load_onnx_session(self):
         """Load ONNX runtime session."""
         onnx_path = self.model_dir / "model.onnx"
-        
-        # Use GPU if available, otherwise CPU
-        providers = ['CPUExecutionProvider']
+
+        # Use GPU if available, otherwise CPU. The memory arena keeps CPU
+        # activation buffers pooled across runs instead of re-allocating.
+        providers = [('CPUExecutionProvider', {'enable_cpu_mem_arena': True})]
         if 'CUDAExecutionProvider' in ort.get_available_providers():
             providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
-        
-        self.session = ort.InferenceSession(str(onnx_path), providers=providers)
-        
-        # Get input names
+        else:
+            # CPU-only inference benefits from dynamic int8 weights (half the
+            # weight bytes, int8 dot products); GPU keeps the FP32 model.
+            quant_path = self._quantize_for_cpu(onnx_path)
+            if quant_path is not None:
+                onnx_path = quant_path
+
+        # Graph optimization (fused attention/gelu kernels) happens at session
+        # build; persist the optimized graph next to the model so boots after
+        # the first one skip the re-optimization pass.
+        optimized_path = onnx_path.with_name(onnx_path.stem + ".optimized.onnx")
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = os.cpu_count() or 1
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # Memory pattern reuses activation allocations across runs. Model
+        # dibaca dari path (bukan bytes) supaya ORT bisa mmap file weight:
+        # page read-only-nya dishare OS antar worker process.
+        sess_options.enable_mem_pattern = True
+        if optimized_path.exists():
+            onnx_path = optimized_path
+        else:
+            sess_options.optimized_model_filepath = str(optimized_path)
+
+        self.session = ort.InferenceSession(str(onnx_path), sess_options, providers=providers)
+
+        # Get input/output names
         self.input_names = [inp.name for inp in self.session.get_inputs()]
+        self.output_name = self.session.get_outputs()[0].name
+        self._use_cuda = 'CUDAExecutionProvider' in self.session.get_providers()
+
+    def _run(self, onnx_inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Run the session through IO binding.
+
+        Di CPU, OrtValue membungkus array numpy zero-copy sehingga ORT
+        tidak menyalin buffer input per panggilan. Di CUDA, input disalin
+        eksplisit sekali ke device dan logits tetap di device sampai satu
+        copy balik di akhir — tanpa staging bolak-balik implisit per run.
+        """
+        device = 'cuda' if self._use_cuda else 'cpu'
+        binding = self.session.io_binding()
+        for name, arr in onnx_inputs.items():
+            binding.bind_ortvalue_input(
+                name, ort.OrtValue.ortvalue_from_numpy(arr, device, 0)
+            )
+        binding.bind_output(self.output_name, device)
+        self.session.run_with_iobinding(binding)
+        return binding.get_outputs()[0].numpy()
     
     def _softmax(self, logits: np.ndarray) -> np.ndarray:
-        """Apply softmax to logits."""
-        exp_logits = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
-        return exp_logits / np.sum(exp_logits, axis=-1, keepdims=True)
+        """Apply softmax to logits in place (logits buffer is consumed)."""
+        # Operasi out= menghindari array temporer per batch; buffer logits
+        # milik kita (output session.run) jadi aman ditimpa.
+        np.subtract(logits, np.max(logits, axis=-1, keepdims=True), out=logits)
+        np.exp(logits, out=logits)
+        logits /= np.sum(logits, axis=-1, keepdims=True)
+        return logits
     
     def predict(self, texts: List[str], preprocess: bool = True) -> List[Dict[str, Any]]:
         """
@@ -173,52 +278,55 @@ class IndoBertSentimentModel:
             List of prediction dicts with label, score, and all scores
         """
         if preprocess:
-            texts = [preprocess_text(t) for t in texts]
-        
-        # Tokenize (gunakan max_length yang sama dengan training: 128)
-        encoded = self.tokenizer(
-            texts,
-            padding=True,
-            truncation=True,
-            max_length=128,
-            return_tensors="np"
-        )
-        
-        # Prepare ONNX inputs
-        onnx_inputs = {}
-        for name in self.input_names:
-            if name == "input_ids":
-                onnx_inputs[name] = encoded["input_ids"].astype(np.int64)
-            elif name == "attention_mask":
-                onnx_inputs[name] = encoded["attention_mask"].astype(np.int64)
-            elif name == "token_type_ids" and "token_type_ids" in encoded:
-                onnx_inputs[name] = encoded["token_type_ids"].astype(np.int64)
-        
-        # Run inference
-        outputs = self.session.run(None, onnx_inputs)
-        logits = outputs[0]
-        
-        # Convert to probabilities
-        probs = self._softmax(logits)
-        
-        # Build results
-        results = []
-        for prob in probs:
-            pred_idx = int(np.argmax(prob))
-            pred_label = self.id2label[pred_idx]
-            pred_score = float(prob[pred_idx])
-            
-            all_scores = {
-                self.id2label[i]: float(prob[i])
-                for i in range(self.num_labels)
-            }
-            
-            results.append({
-                "label": pred_label,
-                "score": pred_score,
-                "scores": all_scores
-            })
+            # Cast ke str agar key cache lru_cache selalu hashable & konsisten
+            texts = [preprocess_text(str(t)) for t in texts]
         
+        # Tokenisasi per teks dari cache (pre-padding). attention_mask
+        # sebelum padding selalu 1 dan token_type_ids selalu 0 untuk single
+        # sequence, jadi cukup input_ids yang di-memo.
+        token_ids = [self._tokenize_one(str(t)) for t in texts]
+        pad_id = self.tokenizer.pad_token_id or 0
+        labels = self._labels
+
+        # Urutkan berdasarkan panjang token lalu inference per bucket:
+        # padding hanya sampai teks terpanjang di bucket-nya, bukan
+        # terpanjang se-batch, jadi komentar pendek tidak membayar FLOP
+        # padding milik caption panjang. Hasil ditaruh kembali di posisi
+        # asli lewat indeks.
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(token_ids)
+        for start in range(0, len(order), self.BUCKET_SIZE):
+            bucket = order[start:start + self.BUCKET_SIZE]
+            bucket_ids = [token_ids[i] for i in bucket]
+            max_len = max(len(ids) for ids in bucket_ids)
+            input_ids = np.full((len(bucket), max_len), pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(bucket), max_len), dtype=np.int64)
+            for row, ids in enumerate(bucket_ids):
+                input_ids[row, :len(ids)] = ids
+                attention_mask[row, :len(ids)] = 1
+
+            # Prepare ONNX inputs
+            onnx_inputs = {}
+            for name in self.input_names:
+                if name == "input_ids":
+                    onnx_inputs[name] = input_ids
+                elif name == "attention_mask":
+                    onnx_inputs[name] = attention_mask
+                elif name == "token_type_ids":
+                    onnx_inputs[name] = np.zeros((len(bucket), max_len), dtype=np.int64)
+
+            # Run inference lalu bangun hasil. argmax sekali per bucket dan
+            # tolist() mengubah semua nilai ke float Python dalam satu
+            # panggilan C, bukan float(prob[i]) per elemen.
+            probs = self._softmax(self._run(onnx_inputs))
+            pred_idxs = probs.argmax(axis=-1).tolist()
+            for idx, prob, pred_idx in zip(bucket, probs.tolist(), pred_idxs):
+                results[idx] = {
+                    "label": labels[pred_idx],
+                    "score": prob[pred_idx],
+                    "scores": dict(zip(labels, prob))
+                }
+
         return results
     
     def predict_single(self, text: str, preprocess: bool = True) -> Dict[str, Any]:
@@ -243,6 +351,15 @@ def get_indobert_model() -> IndoBertSentimentModel:
     return _model_instance
 
 
+def warmup() -> None:
+    """Load the model and run a dummy inference so the first request is warm."""
+    try:
+        model = get_indobert_model()
+        model.predict_single("warmup", preprocess=False)
+    except Exception as e:
+        print(f"Warning: IndoBERT warmup skipped: {e}")
+
+
 def predict_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
     """Predict sentiment for multiple texts."""
     model = get_indobert_model()
@@ -6,10 +6,14 @@ Berdasarkan notebook SENTIMENT ANALYST.ipynb
 """
 
 import csv
+import os
+import pickle
 import re
+from sys import intern
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import List, Dict, Any, Set, Tuple
-from functools import lru_cache
 
 from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
 from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
@@ -106,6 +110,12 @@ def get_kamus_sentimen() -> Dict[str, float]:
     """Get combined sentiment lexicon."""
     return {**get_kamus_positif(), **get_kamus_negatif()}
 
+
+@lru_cache(maxsize=1)
+def get_kamus_sizes() -> Tuple[int, int]:
+    """Get (positif, negatif) dictionary sizes, computed once for /health."""
+    return len(load_kamus_positif()), len(load_kamus_negatif())
+
 # Kata-kata negasi
 KATA_NEGASI: Set[str] = {
     "tidak", "bukan", "kurang", "salah", "belum",
@@ -133,22 +143,26 @@ NORMALISASI_DICT: Dict[str, str] = {
 # Preprocessing Functions
 # ============================================================
 
-# Emoji pattern
-EMOJI_PATTERN = re.compile(
-    "["
-    "\U0001F600-\U0001F64F"
-    "\U0001F300-\U0001F5FF"
-    "\U0001F680-\U0001F6FF"
-    "\U0001F1E0-\U0001F1FF"
-    "\U00002500-\U00002BEF"
-    "\U00002702-\U000027B0"
-    "\U000024C2-\U0001F251"
-    "\U0001F900-\U0001F9FF"
-    "\U0001FA70-\U0001FAFF"
-    "\U0001F018-\U0001F270"
-    "\U0001F000-\U0001F02F"
-    "]+",
-    flags=re.UNICODE
+# Pattern clean_text dikompilasi sekali di module level; tiap dokumen tidak
+# membayar lookup cache re ulang per panggilan sub
+_URL_MENTION_RE = re.compile(r"http\S+|www\S+|@\S+")
+_HASHTAG_RE = re.compile(r"#(\w+)")
+
+
+class _StripTable(dict):
+    """Tabel str.translate untuk strip non-huruf: setara [^a-z\\s] -> ' '.
+
+    Entri ASCII diprecompute; codepoint di luar tabel (emoji dan unicode
+    lain) jatuh ke __missing__ dan ikut jadi spasi.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        return " "
+
+
+_KEEP_CHARS = set("abcdefghijklmnopqrstuvwxyz \t\n\r\x0b\x0c")
+_STRIP_TABLE = _StripTable(
+    {i: (chr(i) if chr(i) in _KEEP_CHARS else " ") for i in range(128)}
 )
 
 
@@ -177,6 +191,18 @@ def get_stemmer():
     return stem_factory.create_stemmer()
 
 
+@lru_cache(maxsize=131072)
+def _stem_word(word: str) -> str:
+    """Stem one word, memoized.
+
+    Sastrawi stemming is pure-Python and dominates preprocessing time;
+    comment vocabulary repeats heavily, so hot words cost one dict hit
+    instead of a full affix-stripping pass. Hasilnya di-intern supaya
+    probe kamus memakai fast-path identitas pointer.
+    """
+    return intern(get_stemmer().stem(word))
+
+
 def normalize_word(word: str) -> str:
     """Normalize slang words."""
     return NORMALISASI_DICT.get(word, word)
@@ -188,18 +214,17 @@ def clean_text(text: str) -> str:
         return ""
     
     text = text.lower()
-    
+
     # Hapus URL & mention
-    text = re.sub(r"http\S+|www\S+|@\S+", " ", text)
+    text = _URL_MENTION_RE.sub(" ", text)
     # Simpan isi hashtag (#enak -> enak)
-    text = re.sub(r"#(\w+)", r"\1", text)
-    # Hapus emoji
-    text = EMOJI_PATTERN.sub(" ", text)
-    # Sisakan huruf dan spasi
-    text = re.sub(r"[^a-z\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    
-    return text
+    text = _HASHTAG_RE.sub(r"\1", text)
+    # Hapus emoji + karakter non-huruf dalam satu scan: semua rentang
+    # emoji adalah subset dari non-[a-z spasi], jadi satu translate
+    # C-loop menggantikan pass regex per karakter
+    text = text.translate(_STRIP_TABLE)
+    # " ".join(split()) merapikan spasi tanpa pass regex tambahan
+    return " ".join(text.split())
 
 
 def preprocess_text(text: str, use_stemming: bool = True) -> List[str]:
@@ -213,22 +238,16 @@ def preprocess_text(text: str, use_stemming: bool = True) -> List[str]:
     Returns:
         List of preprocessed tokens
     """
-    text = clean_text(text)
-    tokens = text.split()
-    
-    # Normalize
-    tokens = [normalize_word(w) for w in tokens]
-    
-    # Remove stopwords
-    stopwords = get_stopwords()
-    tokens = [w for w in tokens if w not in stopwords]
-    
-    # Stemming (optional)
+    # Normalisasi -> stopword filter -> stemming difusi jadi satu
+    # comprehension: tanpa dua list antara, dengan getter di-bind ke local
+    # supaya loop token tidak membayar lookup atribut/global per token
+    normalize = NORMALISASI_DICT.get
+    stopwords = _STOPWORDS
+    normalized = (normalize(t, t) for t in clean_text(text).split())
     if use_stemming:
-        stemmer = get_stemmer()
-        tokens = [stemmer.stem(w) for w in tokens]
-    
-    return tokens
+        stem = _stem_word
+        return [stem(w) for w in normalized if w not in stopwords]
+    return [w for w in normalized if w not in stopwords]
 
 
 # ============================================================
@@ -238,72 +257,79 @@ def preprocess_text(text: str, use_stemming: bool = True) -> List[str]:
 def hitung_sentimen_tokens(
     tokens: List[str],
     base_negator_weight: float = -1.0,
-    lookahead: int = 3
+    lookahead: int = 3,
+    track_matches: bool = True
 ) -> Tuple[float, Dict[str, float]]:
     """
     Calculate sentiment score with negation handling.
-    
+
     Args:
         tokens: List of preprocessed tokens
         base_negator_weight: Default weight for standalone negator
         lookahead: How many tokens ahead to look for negation target
-        
+        track_matches: Set False di jalur "skor saja" untuk melewati
+            pencatatan matched words sama sekali
+
     Returns:
         Tuple of (total_score, matched_words_dict)
     """
-    # Load kamus dari CSV (cached)
-    kamus_positif = get_kamus_positif()
-    kamus_negatif = get_kamus_negatif()
-    
+    # Bind singleton ke local: inner loop pakai LOAD_FAST, bukan
+    # LOAD_GLOBAL + panggilan lru_cache per invokasi. _KAMUS bertanda
+    # menggabungkan kedua kamus, jadi jalur umum cukup satu probe dict.
+    kamus_get = _KAMUS.get
+    kamus_negatif_get = _KAMUS_NEG.get
+    neg_in = KATA_NEGASI.__contains__
+    # Konfigurasi tidak berubah per panggilan; lipat aritmetika yang
+    # invarian keluar dari loop sehingga cabang negasi tinggal satu min()
+    lookahead_plus_1 = lookahead + 1
+
     total = 0.0
-    matched_words: Dict[str, float] = {}
+    # Akumulasi ke list tuple; dict dibangun sekali di akhir sehingga
+    # inner loop bebas dari hashing + resize dict per match
+    matched: List[Tuple[str, float]] = []
     i = 0
     n = len(tokens)
-    
+
     while i < n:
         w = tokens[i].strip().lower()
-        
-        if w in KATA_NEGASI:
+
+        if neg_in(w):
             flipped = False
-            # Cari target berkamus di 1..lookahead token berikutnya
-            for j in range(i + 1, min(i + 1 + lookahead, n)):
+            # Cari target berkamus di 1..lookahead token berikutnya;
+            # negasi membalik tanda skor
+            for j in range(i + 1, min(i + lookahead_plus_1, n)):
                 nxt = tokens[j].strip().lower()
-                if nxt in kamus_positif:
-                    score = -kamus_positif[nxt]
+                s = kamus_get(nxt)
+                if s is not None:
+                    score = -s
                     total += score
-                    matched_words[f"tidak {nxt}"] = score
+                    if track_matches:
+                        matched.append(("tidak " + nxt, score))
                     i = j + 1
                     flipped = True
                     break
-                elif nxt in kamus_negatif:
-                    score = -kamus_negatif[nxt]
-                    total += score
-                    matched_words[f"tidak {nxt}"] = score
-                    i = j + 1
-                    flipped = True
-                    break
-            
+
             if not flipped:
                 # Negator berdiri sendiri tanpa target berkamus
-                score = kamus_negatif.get(w, base_negator_weight)
+                score = kamus_negatif_get(w, base_negator_weight)
                 total += score
-                matched_words[w] = score
+                if track_matches:
+                    matched.append((w, score))
                 i += 1
             continue
-        
-        # Kata biasa
-        if w in kamus_positif:
-            score = kamus_positif[w]
-            total += score
-            matched_words[w] = score
-        elif w in kamus_negatif:
-            score = kamus_negatif[w]
-            total += score
-            matched_words[w] = score
-        
+
+        # Kata biasa: satu lookup bertanda, tanpa cabang positif/negatif
+        s = kamus_get(w)
+        if s is not None:
+            total += s
+            if track_matches:
+                matched.append((w, s))
+
         i += 1
-    
-    return total, matched_words
+
+    # dict() atas pairs mempertahankan semantik lama (key duplikat: nilai
+    # terakhir menang) dalam satu konstruksi C
+    return total, dict(matched)
 
 
 def klasifikasi_sentimen(skor: float) -> str:
@@ -320,35 +346,163 @@ def klasifikasi_sentimen(skor: float) -> str:
 # Public API
 # ============================================================
 
-def predict_sentiment_lexicon(texts: List[str], use_stemming: bool = True) -> List[Dict[str, Any]]:
+def warmup() -> None:
+    """Load kamus, stopwords and stemmer so the first request is warm."""
+    try:
+        predict_sentiment_lexicon_single("warmup")
+    except Exception as e:
+        print(f"Warning: Lexicon warmup skipped: {e}")
+
+
+def _predict_one(text: str, use_stemming: bool = True) -> Dict[str, Any]:
+    """Preprocess + skor satu teks jadi satu result dict."""
+    tokens = preprocess_text(text, use_stemming=use_stemming)
+    score, matched_words = hitung_sentimen_tokens(tokens)
+    return {
+        "label": klasifikasi_sentimen(score),
+        "score": score,
+        "tokens": tokens,
+        "matched_words": matched_words
+    }
+
+
+def _process_chunk(chunk: List[str], use_stemming: bool = True) -> List[Dict[str, Any]]:
+    """Worker helper: proses satu chunk teks di process terpisah."""
+    return [_predict_one(text, use_stemming) for text in chunk]
+
+
+# Di bawah ini, overhead fork + pickle lebih besar daripada untung paralel
+_PARALLEL_MIN_TEXTS = 256
+
+
+def predict_sentiment_lexicon(
+    texts: List[str],
+    use_stemming: bool = True,
+    n_jobs: int = 1
+) -> List[Dict[str, Any]]:
     """
     Predict sentiment for multiple texts using lexicon method.
-    
+
     Args:
         texts: List of input texts
         use_stemming: Whether to apply stemming
-        
+        n_jobs: Jumlah worker process untuk backfill besar; preprocessing
+            (regex + stemming) CPU-bound dan independen per teks, jadi
+            skala mendekati linear dengan core. 1 = serial (default),
+            -1 = semua core. Batch kecil tetap serial karena overhead
+            fork mendominasi.
+
     Returns:
         List of prediction dicts
     """
-    results = []
-    
-    for text in texts:
-        tokens = preprocess_text(text, use_stemming=use_stemming)
-        score, matched_words = hitung_sentimen_tokens(tokens)
-        label = klasifikasi_sentimen(score)
-        
-        results.append({
+    if n_jobs != 1 and len(texts) >= _PARALLEL_MIN_TEXTS:
+        workers = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+        # ~4 chunk per worker supaya chunk lambat tidak jadi straggler
+        chunk_size = max(len(texts) // (workers * 4), 1)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results: List[Dict[str, Any]] = []
+        # Worker mematerialisasi kamus/stopwords/stemmer saat import module
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(partial(_process_chunk, use_stemming=use_stemming), chunks):
+                results.extend(part)
+        return results
+
+    return [_predict_one(text, use_stemming) for text in texts]
+
+
+# Teks panjang dilewatkan tanpa cache supaya memori cache terikat
+_SINGLE_CACHE_MAX_TEXT = 512
+
+
+@lru_cache(maxsize=10000)
+def _predict_single_cached(text: str, use_stemming: bool) -> Tuple[str, float, tuple, tuple]:
+    """Memo hasil prediksi single dalam bentuk immutable (tuple)."""
+    result = _predict_one(text, use_stemming)
+    return (
+        result["label"],
+        result["score"],
+        tuple(result["tokens"]),
+        tuple(result["matched_words"].items()),
+    )
+
+
+def predict_sentiment_lexicon_single(text: str, use_stemming: bool = True) -> Dict[str, Any]:
+    """Predict sentiment for a single text.
+
+    Teks pendek yang berulang (retry, komentar duplikat) di-memo: repeat
+    cuma membayar satu lookup dict, bukan preprocess + skor ulang. Dict
+    hasil dibangun ulang per panggilan agar cache tidak bocor lewat mutasi.
+    """
+    if len(text) <= _SINGLE_CACHE_MAX_TEXT:
+        label, score, tokens, matched = _predict_single_cached(text, use_stemming)
+        return {
             "label": label,
             "score": score,
-            "tokens": tokens,
-            "matched_words": matched_words
-        })
-    
-    return results
+            "tokens": list(tokens),
+            "matched_words": dict(matched)
+        }
+    return _predict_one(text, use_stemming)
 
 
-def predict_sentiment_lexicon_single(text: str, use_stemming: bool = True) -> Dict[str, Any]:
-    """Predict sentiment for a single text."""
-    results = predict_sentiment_lexicon([text], use_stemming=use_stemming)
-    return results[0]
+# ============================================================
+# Frozen Singletons
+# ============================================================
+
+# Dimaterialisasi sekali saat import: kamus dan stopwords tidak berubah
+# selama proses hidup, jadi loop token panas membaca module global langsung
+# tanpa panggilan + tuple-hash + lock lru_cache per invokasi. Loader tetap
+# degradasi halus kalau CSV tidak ada (dict kosong + warning).
+#
+# Supaya cold start worker baru tidak membayar parse CSV + konstruksi
+# StopWordRemoverFactory lagi, hasil resolusi di-snapshot ke satu pickle di
+# samping CSV-nya; boot berikutnya cukup satu pickle.load.
+_SNAPSHOT_PATH = Path(settings.LEXICON_DIR) / "lexicon_snapshot.pkl"
+_SNAPSHOT_SOURCES = ("kamus_positif.csv", "kamus_negatif.csv")
+
+
+def _load_lexicon_snapshot():
+    """Load snapshot kalau ada dan tidak lebih tua dari CSV sumbernya."""
+    try:
+        snap_mtime = _SNAPSHOT_PATH.stat().st_mtime
+    except OSError:
+        return None
+    for name in _SNAPSHOT_SOURCES:
+        src = Path(settings.LEXICON_DIR) / name
+        if src.exists() and src.stat().st_mtime > snap_mtime:
+            return None
+    try:
+        with open(_SNAPSHOT_PATH, "rb") as f:
+            snap = pickle.load(f)
+        return snap["sw"], snap["pos"], snap["neg"]
+    except Exception:
+        return None
+
+
+def _save_lexicon_snapshot(sw: frozenset, pos: Dict[str, float], neg: Dict[str, float]) -> None:
+    try:
+        with open(_SNAPSHOT_PATH, "wb") as f:
+            pickle.dump({"sw": sw, "pos": pos, "neg": neg}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # Filesystem read-only (mis. serverless): boot tetap jalan, hanya
+        # tanpa snapshot
+        pass
+
+
+_snapshot = _load_lexicon_snapshot()
+if _snapshot is not None:
+    _STOPWORDS, _KAMUS_POS, _KAMUS_NEG = _snapshot
+else:
+    _STOPWORDS = frozenset(get_stopwords())
+    _KAMUS_POS = get_kamus_positif()
+    _KAMUS_NEG = get_kamus_negatif()
+    _save_lexicon_snapshot(_STOPWORDS, _KAMUS_POS, _KAMUS_NEG)
+
+# Intern semua key: token hasil stem juga di-intern, jadi probe dict di loop
+# skor kena fast-path identitas pointer sebelum fallback memcmp
+_STOPWORDS = frozenset(intern(w) for w in _STOPWORDS)
+_KAMUS_POS = {intern(k): v for k, v in _KAMUS_POS.items()}
+_KAMUS_NEG = {intern(k): v for k, v in _KAMUS_NEG.items()}
+# Kamus gabungan bertanda (positif > 0, negatif < 0). Entri positif ditaruh
+# terakhir supaya kata yang ada di kedua kamus mengikuti prioritas lama
+# (cek positif dulu).
+_KAMUS: Dict[str, float] = {**_KAMUS_NEG, **_KAMUS_POS}
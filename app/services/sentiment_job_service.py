@@ -0,0 +1,23 @@
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.models.sentiment_job import SentimentJob
+
+
+def get_job_by_id(db: Session, job_id: str) -> Optional[SentimentJob]:
+    """Get a sentiment job by ID."""
+    return db.get(SentimentJob, job_id)
+
+
+def create_job(db: Session, post_id: str, user_id: str, method: str) -> SentimentJob:
+    """Create a new queued sentiment job."""
+    job = SentimentJob(
+        instagram_post_id=post_id,
+        user_id=user_id,
+        method=method
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
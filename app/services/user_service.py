@@ -1,7 +1,6 @@
-from datetime import datetime
 from typing import Optional, List
 
-from sqlmodel import Session, select
+from sqlmodel import Session, or_, select
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserCreateOAuth, UserUpdate
@@ -25,6 +24,28 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.exec(statement).first()
 
 
+def get_user_conflicts(
+    db: Session, username: str, email: str
+) -> tuple[Optional[User], Optional[User]]:
+    """Check username and email conflicts in a single query.
+
+    Returns (user matching username, user matching email); the register
+    flow needs both answers, and one OR query costs one round trip
+    instead of two.
+    """
+    statement = select(User).where(
+        or_(User.username == username, User.email == email)
+    )
+    username_match: Optional[User] = None
+    email_match: Optional[User] = None
+    for user in db.exec(statement):
+        if user.username == username:
+            username_match = user
+        if user.email == email:
+            email_match = user
+    return username_match, email_match
+
+
 def get_user_by_oauth(db: Session, provider: str, provider_id: str) -> Optional[User]:
     """Get a user by OAuth provider and ID."""
     statement = select(User).where(
@@ -84,9 +105,9 @@ def update_user(db: Session, user_id: str, user_update: UserUpdate) -> Optional[
     
     for key, value in update_data.items():
         setattr(db_user, key, value)
-    
-    db_user.updated_at = datetime.utcnow()
-    db.add(db_user)
+
+    # updated_at diisi DB lewat onupdate=func.now(); entity sudah tracked,
+    # jadi tidak perlu db.add
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -0,0 +1,69 @@
+"""
+Micro-batching layer untuk prediksi IndoBERT single-text.
+
+Request single yang datang bersamaan tidak lagi menjalankan forward pass
+BERT sendiri-sendiri: setiap caller meng-enqueue (text, future), lalu satu
+worker task menguras antrian sampai MAX_BATCH teks atau MAX_WAIT_SECONDS
+berlalu, menjalankan SATU panggilan ONNX untuk seluruh batch di threadpool,
+dan menyebarkan hasilnya kembali lewat future masing-masing. Di CPU, BERT
+skala sublinear terhadap batch size, jadi throughput naik mendekati ukuran
+batch saat beban tinggi; saat sepi, satu request hanya menunggu MAX_WAIT.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.indobert_service import predict_sentiment
+
+# Batas batch per panggilan ONNX dan lama menunggu teks tambahan
+MAX_BATCH = 32
+MAX_WAIT_SECONDS = 0.005
+
+_queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+_worker_task: Optional[asyncio.Task] = None
+
+
+async def _worker_loop() -> None:
+    """Kuras antrian jadi micro-batch dan fan-out hasil ke future."""
+    while True:
+        # Blokir sampai ada minimal satu request
+        batch: List[Tuple[str, asyncio.Future]] = [await _queue.get()]
+        # Kumpulkan teks tambahan sebentar supaya batch terisi
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(
+                    await asyncio.wait_for(_queue.get(), timeout=MAX_WAIT_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        texts = [text for text, _ in batch]
+        try:
+            results = await run_in_threadpool(predict_sentiment, texts)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            continue
+
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+
+def _ensure_worker() -> None:
+    """Buat queue + worker task sekali, terikat ke event loop yang aktif."""
+    global _queue, _worker_task
+    if _worker_task is None or _worker_task.done():
+        _queue = asyncio.Queue()
+        _worker_task = asyncio.get_running_loop().create_task(_worker_loop())
+
+
+async def predict_single_batched(text: str) -> Dict[str, Any]:
+    """Prediksi satu teks lewat micro-batcher; await sampai hasilnya siap."""
+    _ensure_worker()
+    fut: asyncio.Future = asyncio.get_running_loop().create_future()
+    await _queue.put((text, fut))
+    return await fut
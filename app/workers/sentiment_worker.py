@@ -0,0 +1,134 @@
+"""
+Background worker untuk analisis sentimen per post.
+
+Menjalankan pipeline streaming predict + bulk UPDATE di luar request cycle
+dengan Session sendiri, sehingga endpoint analyze bisa langsung balas 202
+tanpa menahan koneksi pool selama inference berjalan.
+"""
+
+from typing import Optional
+
+from app.db.database import SessionLocal
+from app.models.enums import SentimentJobStatus, SentimentLabel as DBSentimentLabel
+from app.models.sentiment_job import SentimentJob
+from app.services import ig_comment_service
+
+
+# Mapping dari label prediksi ("Positif"/"Negatif"/"Netral") ke database enum
+PREDICTION_TO_DB_LABEL = {
+    "Positif": DBSentimentLabel.POSITIVE,
+    "Negatif": DBSentimentLabel.NEGATIVE,
+    "Netral": DBSentimentLabel.NEUTRAL,
+}
+
+
+def _set_job_status(
+    db,
+    job: SentimentJob,
+    job_status: SentimentJobStatus,
+    summary: Optional[dict] = None,
+    message: Optional[str] = None,
+) -> None:
+    job.status = job_status
+    if summary is not None:
+        job.summary = summary
+    if message is not None:
+        job.message = message
+    db.add(job)
+    db.commit()
+
+
+def _predict_unique(predict, texts):
+    """Predict with duplicate texts collapsed to one inference each.
+
+    Instagram comments repeat heavily (single emoji, "nice", bot spam) and
+    predictions are a pure function of the text, so each unique text runs
+    through the model once and the result is scattered back.
+    """
+    unique: dict = {}
+    for i, text in enumerate(texts):
+        unique.setdefault(text, []).append(i)
+
+    unique_texts = list(unique)
+    unique_preds = predict(unique_texts)
+
+    predictions = [None] * len(texts)
+    for text, pred in zip(unique_texts, unique_preds):
+        for i in unique[text]:
+            predictions[i] = pred
+    return predictions
+
+
+def _invalidate_comment_caches(post_id: str) -> None:
+    """Drop the comment router's cached reads for a post.
+
+    The worker writes sentiment columns outside the CRUD handlers, so a
+    client that polls the job to COMPLETED and refetches must not be
+    served pre-analysis pages. Imported lazily: routers import workers,
+    not the other way around.
+    """
+    from app.routers.ig_comments import invalidate_comments_for_post
+    invalidate_comments_for_post(post_id)
+
+
+def analyze_post_task(job_id: str) -> None:
+    """Run the streaming sentiment pipeline for a queued job."""
+    db = SessionLocal()
+    try:
+        job = db.get(SentimentJob, job_id)
+        if job is None:
+            return
+
+        if job.method == "lexicon":
+            from app.services.lexicon_service import predict_sentiment_lexicon as predict
+        else:
+            from app.services.indobert_service import predict_sentiment as predict
+
+        _set_job_status(db, job, SentimentJobStatus.RUNNING)
+
+        # Label set-nya tetap (3 nilai), jadi tiga counter lokal lebih murah
+        # daripada hash-insert Counter per komentar
+        positif = negatif = netral = 0
+        total_comments = 0
+
+        try:
+            # Chunk berisi (id, text) tuple, bukan instance ORM: pipeline
+            # hanya membaca teks dan menulis balik per id
+            for chunk in ig_comment_service.iter_comment_texts_by_post(db, post_id=job.instagram_post_id):
+                total_comments += len(chunk)
+                predictions = _predict_unique(predict, [text for _, text in chunk])
+
+                mappings = [
+                    {
+                        "id": comment_id,
+                        "sentiment_label": PREDICTION_TO_DB_LABEL.get(pred["label"]),
+                        "sentiment_score": pred["score"],
+                    }
+                    for (comment_id, _), pred in zip(chunk, predictions)
+                ]
+                for pred in predictions:
+                    label = pred["label"]
+                    positif += label == "Positif"
+                    negatif += label == "Negatif"
+                    netral += label == "Netral"
+
+                ig_comment_service.update_sentiments_bulk(db, mappings)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _set_job_status(
+                db, job, SentimentJobStatus.FAILED,
+                message=f"Sentiment prediction failed: {str(e)}"
+            )
+            return
+        finally:
+            # Also on failure: earlier chunks may already be committed
+            _invalidate_comment_caches(job.instagram_post_id)
+
+        _set_job_status(
+            db, job, SentimentJobStatus.COMPLETED,
+            summary={"Positif": positif, "Negatif": negatif, "Netral": netral},
+            message=f"Successfully analyzed {total_comments} comments"
+        )
+    finally:
+        db.close()
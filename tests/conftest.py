@@ -0,0 +1,14 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a test client, shared across the whole run.
+
+    Satu TestClient untuk semua test: konstruksi client (import app,
+    registrasi route) cukup dibayar sekali, bukan per test.
+    """
+    return TestClient(app)
@@ -1,15 +1,3 @@
-import pytest
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
-
-
 def test_read_root(client):
     """Test root endpoint."""
     response = client.get("/")
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models.ids import generate_cuid
+from app.models.ig_comment import InstagramComment
+from app.services import ig_comment_service
+
+
+def _seed_comments(db, post_id, count):
+    """Insert comments with duplicate timestamps to exercise the id tie-break."""
+    base = datetime(2024, 1, 1)
+    for i in range(count):
+        db.add(InstagramComment(
+            instagram_post_id=post_id,
+            comment_id=f"c{i}",
+            text=f"t{i}",
+            owner_username="o",
+            # Pasangan index berbagi timestamp supaya tie-breaker id teruji
+            timestamp=base + timedelta(hours=i // 2),
+        ))
+        db.commit()
+
+
+def test_keyset_pages_are_newest_first_and_complete():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    post_id = generate_cuid()
+
+    with Session(engine) as db:
+        _seed_comments(db, post_id, 6)
+
+        seen = []
+        after = None
+        while True:
+            page = ig_comment_service.get_comments_by_post(
+                db, post_id=post_id, limit=2, after_id=after
+            )
+            if not page:
+                break
+            seen.extend(page)
+            after = page[-1]["id"]
+
+        # Every row is reachable exactly once through the cursor
+        assert len(seen) == 6
+        assert len({row["id"] for row in seen}) == 6
+        # Pages stitch together newest-first on (timestamp DESC, id DESC)
+        keys = [(row["timestamp"], row["id"]) for row in seen]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_keyset_vanished_anchor_returns_empty_page():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    post_id = generate_cuid()
+
+    with Session(engine) as db:
+        _seed_comments(db, post_id, 2)
+        page = ig_comment_service.get_comments_by_post(
+            db, post_id=post_id, limit=2, after_id=generate_cuid()
+        )
+        assert page == []
+
+
+def test_offset_fallback_matches_keyset_order():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    post_id = generate_cuid()
+
+    with Session(engine) as db:
+        _seed_comments(db, post_id, 6)
+        keyset = ig_comment_service.get_comments_by_post(db, post_id=post_id, limit=6)
+        offset = []
+        for skip in (0, 2, 4):
+            offset.extend(ig_comment_service.get_comments_by_post(
+                db, post_id=post_id, skip=skip, limit=2
+            ))
+        assert [r["id"] for r in offset] == [r["id"] for r in keyset]
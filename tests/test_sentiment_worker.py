@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime
+
+from app.db.database import SessionLocal, create_db_and_tables
+from app.models.enums import SentimentJobStatus
+from app.models.ids import generate_cuid
+from app.models.ig_comment import InstagramComment
+from app.models.sentiment_job import SentimentJob
+from app.routers import ig_comments
+from app.workers.sentiment_worker import analyze_post_task
+
+
+def test_analyze_job_completes_and_invalidates_comment_caches():
+    """A completed analyze job must not leave pre-analysis cache entries.
+
+    Klien melakukan poll job sampai COMPLETED lalu refetch; page cache
+    dan per-row cache harus di-drop oleh worker, bukan menunggu TTL.
+    """
+    create_db_and_tables()
+    # Canonical (dashed) form, like every id a client reads back from the
+    # API: the Uuid columns return str(UUID), and the cache keys match it
+    post_id = str(uuid.UUID(generate_cuid()))
+
+    db = SessionLocal()
+    try:
+        comment_ids = []
+        for i, text in enumerate(["enak banget", "buruk sekali"]):
+            comment = InstagramComment(
+                instagram_post_id=post_id,
+                comment_id=f"{post_id}-c{i}",
+                text=text,
+                owner_username="o",
+                timestamp=datetime(2024, 1, 1),
+            )
+            db.add(comment)
+            db.commit()
+            comment_ids.append(comment.id)
+
+        job = SentimentJob(
+            instagram_post_id=post_id,
+            user_id=generate_cuid(),
+            method="lexicon",
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+        # Stale reads seeded the way the router would have
+        page_key = (post_id, 0, 100, None)
+        ig_comments._comment_page_cache[page_key] = ["stale page"]
+        stale_comment = db.get(InstagramComment, comment_ids[0])
+        ig_comments._comment_cache[comment_ids[0]] = (stale_comment, "owner")
+
+        analyze_post_task(job_id)
+
+        # The worker wrote through its own session; drop this session's
+        # cached state (expire_on_commit=False) before re-reading
+        db.expire_all()
+        refreshed = db.get(SentimentJob, job_id)
+        assert refreshed.status == SentimentJobStatus.COMPLETED
+        assert refreshed.summary == {"Positif": 1, "Negatif": 1, "Netral": 0}
+        for comment_id in comment_ids:
+            assert db.get(InstagramComment, comment_id).sentiment_label is not None
+
+        assert page_key not in ig_comments._comment_page_cache
+        assert comment_ids[0] not in ig_comments._comment_cache
+    finally:
+        db.close()
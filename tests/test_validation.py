@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.schemas.lexicon import LexiconPredictRequest
+
+
+def test_json_body_422_matches_default_shape(client):
+    """The fast-parse dependency must emit FastAPI's default 422 payload.
+
+    Klien mengandalkan loc yang diawali "body"; jalur model_validate_json
+    tidak boleh menghasilkan bentuk error yang berbeda dari body handling
+    bawaan untuk model yang sama.
+    """
+    reference = FastAPI()
+
+    @reference.post("/reference")
+    def reference_endpoint(payload: LexiconPredictRequest):
+        return {}
+
+    bad_payload = {"wrong": 1}
+    fast_path = client.post("/api/lexicon/predict", json=bad_payload)
+    default_path = TestClient(reference).post("/reference", json=bad_payload)
+
+    assert fast_path.status_code == 422
+    assert fast_path.json() == default_path.json()
+    error = fast_path.json()["detail"][0]
+    assert error["loc"][0] == "body"
+    assert "url" not in error